@@ -34,4 +34,39 @@ export async function POST(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
+export async function PATCH(
+  request: NextRequest,
+  { params }: { params: Promise<{ id: string }> }
+) {
+  try {
+    const { id } = await params;
+    const body = await request.json();
+    const authHeader = request.headers.get('authorization');
+
+    // Forward only the changed slots to the Firebase Cloud Function
+    const functionsUrl = process.env.FIREBASE_FUNCTIONS_URL || 'http://localhost:5101';
+    const response = await fetch(`${functionsUrl}/submitAvailability/${id}`, {
+      method: 'PATCH',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(authHeader && { 'Authorization': authHeader }),
+      },
+      body: JSON.stringify(body),
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+      return NextResponse.json(data, { status: response.status });
+    }
+
+    return NextResponse.json(data);
+  } catch (error) {
+    console.error('Error updating availability:', error);
+    return NextResponse.json(
+      { error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+}
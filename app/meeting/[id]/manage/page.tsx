@@ -5,9 +5,11 @@ import { useParams, useRouter } from 'next/navigation';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { toast } from 'sonner';
-import { doc, getDoc, collection, getDocs, updateDoc, serverTimestamp, type Firestore } from 'firebase/firestore';
+import { doc, getDoc, updateDoc, serverTimestamp, type Firestore } from 'firebase/firestore';
 import * as firebaseClient from '@/lib/firebase';
 import { getCurrentUser } from '@/lib/auth';
+import { expandSlotRule } from '@/lib/utils';
+import { fetchMeetingParticipants } from '@/lib/availability';
 import { Clock, Users, Brain, CheckCircle, Calendar } from 'lucide-react';
 import ErrorBoundary from '@/components/ErrorBoundary';
 
@@ -108,6 +110,7 @@ export default function ManageMeetingPage() {
       const meetingData = {
         id: meetingDoc.id,
         ...raw,
+        timeSlots: raw.slotRule ? expandSlotRule(raw.slotRule) : raw.timeSlots || [],
         confirmedDateTime: toDateSafe(raw.confirmedDateTime),
         deadline: raw.deadline,
       } as unknown as Meeting;
@@ -120,17 +123,12 @@ export default function ManageMeetingPage() {
         return;
       }
 
-      // Load participants data
-      const participantsSnapshot = await getDocs(collection(dbInstance, 'meetings', meetingId, 'availabilities'));
-      const participantsData: Participant[] = [];
-      
-      participantsSnapshot.forEach((doc) => {
-        participantsData.push({
-          id: doc.id,
-          email: doc.data().email || doc.id,
-          schedule: doc.data().schedule || {}
-        });
-      });
+      // Load participants through the server, which also reads archived meetings' responses
+      const participantsData: Participant[] = (await fetchMeetingParticipants(meetingId)).map(p => ({
+        id: p.userId,
+        email: p.userId,
+        schedule: (p.schedule || {}) as Participant['schedule']
+      }));
 
       setParticipants(participantsData);
 
@@ -8,10 +8,11 @@ import { Input } from '@/components/ui/input';
 import { Textarea } from '@/components/ui/textarea';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { toast } from 'sonner';
-import { collection, doc, onSnapshot, setDoc } from 'firebase/firestore';
+import { collection, doc, onSnapshot } from 'firebase/firestore';
 import { db } from '@/lib/firebase';
 import { getCurrentUser } from '@/lib/auth';
-import { formatTimeSlot, groupTimeSlotsByDate } from '@/lib/utils';
+import { AvailabilityConflictError, fetchMeetingParticipants, saveAvailabilityChanges } from '@/lib/availability';
+import { expandSlotRule, formatTimeSlot, groupTimeSlotsByDate } from '@/lib/utils';
 import { CheckCircle2, XCircle, AlertTriangle, MessageSquare } from 'lucide-react';
 
 type AvailabilityStatus = 'available' | 'maybe' | 'unavailable';
@@ -25,6 +26,7 @@ interface Participant {
   userId: string;
   userName: string;
   schedule: Record<string, Availability>;
+  revision?: number;
 }
 
 interface Meeting {
@@ -37,6 +39,7 @@ interface Meeting {
   status: 'scheduling' | 'confirmed' | 'canceled';
   confirmedDateTime?: Date;
   confirmedReason?: string;
+  archived?: boolean;
 }
 
 interface SchedulingGridProps {
@@ -50,6 +53,9 @@ export default function SchedulingGrid({ meetingId, isHost = false }: Scheduling
   const [loading, setLoading] = useState(true);
   const [userAvailability, setUserAvailability] = useState<Record<string, Availability>>({});
   const [userName, setUserName] = useState('');
+  // Last stored schedule and revision for the current user; saves send only the cells changed since
+  const [savedSchedule, setSavedSchedule] = useState<Record<string, Availability>>({});
+  const [savedRevision, setSavedRevision] = useState(0);
   const [aiLoading, setAiLoading] = useState(false);
 
   const user = getCurrentUser();
@@ -73,7 +79,9 @@ export default function SchedulingGrid({ meetingId, isHost = false }: Scheduling
         setMeeting({
           id: doc.id,
           ...data,
-          timeSlots: data.timeSlots?.map((ts: { toDate: () => Date }) => ts.toDate()) || [],
+          timeSlots: data.slotRule
+            ? expandSlotRule(data.slotRule)
+            : data.timeSlots?.map((ts: { toDate: () => Date }) => ts.toDate()) || [],
           deadline: data.deadline?.toDate(),
           confirmedDateTime: data.confirmedDateTime?.toDate(),
         } as Meeting);
@@ -81,32 +89,49 @@ export default function SchedulingGrid({ meetingId, isHost = false }: Scheduling
       setLoading(false);
     });
 
-    // Listen to participants data  
-    const unsubscribeParticipants = onSnapshot(
+    return () => {
+      unsubscribeMeeting();
+    };
+  }, [meetingId, user]);
+
+  // Archived meetings keep their responses only in the archive, so they are read through the server
+  const archived = meeting ? Boolean(meeting.archived) : undefined;
+
+  useEffect(() => {
+    if (!meetingId || !db || archived === undefined) return;
+
+    const applyParticipants = (participantData: Participant[]) => {
+      setParticipants(participantData);
+
+      // Set current user's availability if exists
+      if (user) {
+        const currentUserData = participantData.find(p => p.userId === user.uid);
+        if (currentUserData) {
+          setSavedSchedule(currentUserData.schedule || {});
+          setSavedRevision(currentUserData.revision || 0);
+          setUserAvailability(currentUserData.schedule || {});
+          setUserName(currentUserData.userName || '');
+        }
+      }
+    };
+
+    if (archived) {
+      fetchMeetingParticipants(meetingId)
+        .then(participantData => applyParticipants(participantData as Participant[]))
+        .catch(error => console.error('Error loading archived participants:', error));
+      return;
+    }
+
+    return onSnapshot(
       collection(db, 'meetings', meetingId, 'availabilities'),
       (snapshot) => {
-        const participantData = snapshot.docs.map(doc => ({
+        applyParticipants(snapshot.docs.map(doc => ({
           userId: doc.id,
           ...doc.data(),
-        })) as Participant[];
-        setParticipants(participantData);
-
-        // Set current user's availability if exists
-        if (user) {
-          const currentUserData = participantData.find(p => p.userId === user.uid);
-          if (currentUserData) {
-            setUserAvailability(currentUserData.schedule || {});
-            setUserName(currentUserData.userName || '');
-          }
-        }
+        })) as Participant[]);
       }
     );
-
-    return () => {
-      unsubscribeMeeting();
-      unsubscribeParticipants();
-    };
-  }, [meetingId, user]);
+  }, [meetingId, user, archived]);
 
   const handleAvailabilityChange = (timeSlotKey: string, status: AvailabilityStatus) => {
     setUserAvailability(prev => ({
@@ -133,18 +158,18 @@ export default function SchedulingGrid({ meetingId, isHost = false }: Scheduling
     }
 
     try {
-      if (!db) {
-        toast.error('Firebaseが設定されていません。環境変数を設定してください。');
-        return;
-      }
-      
-      await setDoc(doc(db, 'meetings', meetingId, 'availabilities', user.uid), {
-        userName: userName.trim(),
-        schedule: userAvailability,
-        updatedAt: new Date(),
-      });
+      const revision = await saveAvailabilityChanges(
+        meetingId, user, userName.trim(), savedSchedule, userAvailability, savedRevision
+      );
+      setSavedSchedule(userAvailability);
+      setSavedRevision(revision);
       toast.success('Availabilityが保存されました。');
     } catch (error) {
+      if (error instanceof AvailabilityConflictError) {
+        // The snapshot listener has already loaded the newer schedule
+        toast.error('別の画面でAvailabilityが更新されました。最新の内容を確認してから再度保存してください。');
+        return;
+      }
       console.error('Availabilityが保存に失敗しました:', error);
       toast.error('Availabilityが保存に失敗しました。');
     }
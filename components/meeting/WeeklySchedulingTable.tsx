@@ -15,9 +15,11 @@ import {
 } from '@/components/ui/table';
 import { Badge } from '@/components/ui/badge';
 import { toast } from 'sonner';
-import { collection, doc, onSnapshot, setDoc } from 'firebase/firestore';
+import { collection, doc, onSnapshot } from 'firebase/firestore';
 import { db } from '@/lib/firebase';
 import { getCurrentUser } from '@/lib/auth';
+import { AvailabilityConflictError, fetchMeetingParticipants, saveAvailabilityChanges } from '@/lib/availability';
+import { expandSlotRule } from '@/lib/utils';
 import { CheckCircle2, XCircle, AlertTriangle, Users, Settings, Brain } from 'lucide-react';
 import { useRouter } from 'next/navigation';
 
@@ -32,6 +34,7 @@ interface Participant {
   userId: string;
   userName: string;
   schedule: Record<string, Availability>;
+  revision?: number;
 }
 
 interface Meeting {
@@ -44,6 +47,7 @@ interface Meeting {
   status: 'scheduling' | 'confirmed' | 'canceled';
   confirmedDateTime?: Date;
   confirmedReason?: string;
+  archived?: boolean;
 }
 
 interface WeeklySchedulingTableProps {
@@ -68,6 +72,9 @@ export default function WeeklySchedulingTable({ meetingId, isHost = false }: Wee
   const [loading, setLoading] = useState(true);
   const [userAvailability, setUserAvailability] = useState<Record<string, Availability>>({});
   const [userName, setUserName] = useState('');
+  // Last stored schedule and revision for the current user; saves send only the cells changed since
+  const [savedSchedule, setSavedSchedule] = useState<Record<string, Availability>>({});
+  const [savedRevision, setSavedRevision] = useState(0);
   const [bulkSelection, setBulkSelection] = useState<AvailabilityStatus>('available');
   const [selectedSlots, setSelectedSlots] = useState<Set<string>>(new Set());
 
@@ -98,7 +105,9 @@ export default function WeeklySchedulingTable({ meetingId, isHost = false }: Wee
         setMeeting({
           id: doc.id,
           ...data,
-          timeSlots: Array.isArray(data.timeSlots)
+          timeSlots: data.slotRule
+            ? expandSlotRule(data.slotRule)
+            : Array.isArray(data.timeSlots)
             ? (data.timeSlots.map((ts: any) => toDateSafe(ts)).filter(Boolean) as Date[])
             : [],
           deadline: toDateSafe(data.deadline) as Date,
@@ -108,30 +117,49 @@ export default function WeeklySchedulingTable({ meetingId, isHost = false }: Wee
       setLoading(false);
     });
 
-    const unsubscribeParticipants = onSnapshot(
+    return () => {
+      unsubscribeMeeting();
+    };
+  }, [meetingId, user]);
+
+  // Archived meetings keep their responses only in the archive, so they are read through the server
+  const archived = meeting ? Boolean(meeting.archived) : undefined;
+
+  useEffect(() => {
+    if (!meetingId || !db || archived === undefined) return;
+
+    const applyParticipants = (participantData: Participant[]) => {
+      setParticipants(participantData);
+
+      // Set current user's availability if exists
+      if (user) {
+        const currentUserData = participantData.find(p => p.userId === user.uid);
+        if (currentUserData) {
+          setSavedSchedule(currentUserData.schedule || {});
+          setSavedRevision(currentUserData.revision || 0);
+          setUserAvailability(currentUserData.schedule || {});
+          setUserName(currentUserData.userName || '');
+        }
+      }
+    };
+
+    if (archived) {
+      fetchMeetingParticipants(meetingId)
+        .then(participantData => applyParticipants(participantData as Participant[]))
+        .catch(error => console.error('Error loading archived participants:', error));
+      return;
+    }
+
+    return onSnapshot(
       collection(db, 'meetings', meetingId, 'availabilities'),
       (snapshot) => {
-        const participantData = snapshot.docs.map(doc => ({
+        applyParticipants(snapshot.docs.map(doc => ({
           userId: doc.id,
           ...doc.data(),
-        })) as Participant[];
-        setParticipants(participantData);
-
-        if (user) {
-          const currentUserData = participantData.find(p => p.userId === user.uid);
-          if (currentUserData) {
-            setUserAvailability(currentUserData.schedule || {});
-            setUserName(currentUserData.userName || '');
-          }
-        }
+        })) as Participant[]);
       }
     );
-
-    return () => {
-      unsubscribeMeeting();
-      unsubscribeParticipants();
-    };
-  }, [meetingId, user]);
+  }, [meetingId, user, archived]);
 
   const groupTimeSlotsByWeek = (timeSlots: Date[]): { dates: string[], timeSlotData: TimeSlotData[] } => {
     if (!timeSlots.length) return { dates: [], timeSlotData: [] };
@@ -237,18 +265,18 @@ export default function WeeklySchedulingTable({ meetingId, isHost = false }: Wee
     }
 
     try {
-      if (!db) {
-        toast.error('Firebaseが設定されていません。環境変数を設定してください。');
-        return;
-      }
-      
-      await setDoc(doc(db, 'meetings', meetingId, 'availabilities', user.uid), {
-        userName: userName.trim(),
-        schedule: userAvailability,
-        updatedAt: new Date(),
-      });
+      const revision = await saveAvailabilityChanges(
+        meetingId, user, userName.trim(), savedSchedule, userAvailability, savedRevision
+      );
+      setSavedSchedule(userAvailability);
+      setSavedRevision(revision);
       toast.success('Availabilityが保存されました！');
     } catch (error) {
+      if (error instanceof AvailabilityConflictError) {
+        // The snapshot listener has already loaded the newer schedule
+        toast.error('別の画面でAvailabilityが更新されました。最新の内容を確認してから再度保存してください。');
+        return;
+      }
       console.error('Error saving availability:', error);
       toast.error('Availabilityが保存に失敗しました。');
     }
@@ -1,15 +1,41 @@
 from firebase_functions import https_fn
 from firebase_admin import firestore, auth
+import contextvars
+import hashlib
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, ValidationError
 from typing import List, Dict, Optional
 import google.generativeai as genai
+from future.time_slots import meeting_slot_keys
+from future.async_firestore import run_async, fetch_meeting_with_availabilities
+from future.responses import json_response
+from future.profiling import profiled, span
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv('GOOGLE_AI_API_KEY'))
 
+# Number of ranked candidates generated per AI suggestion call
+DEFAULT_CANDIDATE_COUNT = 3
+MAX_CANDIDATE_COUNT = 10
+
+# Chunked (map-reduce) mode for meetings too large for one prompt
+CHUNKED_MODE_THRESHOLD = int(os.getenv('AI_CHUNKED_THRESHOLD', '200'))
+DEFAULT_CHUNK_SIZE = int(os.getenv('AI_CHUNK_SIZE', '50'))
+# Smaller chunks only add model calls and cache documents without shrinking any prompt meaningfully
+MIN_CHUNK_SIZE = 10
+DEFAULT_CHUNK_PARALLELISM = int(os.getenv('AI_CHUNK_PARALLELISM', '4'))
+MAX_CHUNK_PARALLELISM = 16
+# 'single' always sends one prompt; 'auto' switches to chunks above CHUNKED_MODE_THRESHOLD
+SUGGESTION_MODES = ('auto', 'single', 'chunked')
+# Only the best-scoring slots are described in the final reduce prompt
+DIGEST_PROMPT_SLOTS = int(os.getenv('AI_DIGEST_PROMPT_SLOTS', '30'))
+MAX_DIGEST_NAMES = 20
+# Firestore rejects batches with more than 500 writes
+DIGEST_WRITE_BATCH_SIZE = 500
+
 class AvailabilityItem(BaseModel):
     time: str  # ISO 8601 format
     status: str  # 'available' | 'maybe' | 'unavailable'
@@ -25,21 +51,43 @@ class AISchedulingInput(BaseModel):
     participants: List[Participant]
     hostInstructions: Optional[str] = ""
 
-class AISchedulingResult(BaseModel):
-    date: str  # yyyy-mm-dd format
+class AISchedulingCandidate(BaseModel):
+    date: str  # ISO 8601 format
     reason: str
+    unavailable: List[str] = []  # names of participants who cannot attend
+
+class AISchedulingResult(BaseModel):
+    candidates: List[AISchedulingCandidate]  # best first
+    parsed: bool = True  # False for the placeholder returned when the model output was unusable
+
+class SlotDigest(BaseModel):
+    time: str  # ISO 8601 format
+    available: int = 0
+    maybe: int = 0
+    unavailable: int = 0
+    unavailableNames: List[str] = []
+    notes: List[str] = []  # summarized conditions from 'maybe' comments
 
+class ChunkDigest(BaseModel):
+    slots: List[SlotDigest]
+    complete: bool = True  # False when the model failed and raw comments were kept; never cached
+
+class SlotScore(BaseModel):
+    time: str
+    availableCount: int
+    maybeCount: int
+    unavailableCount: int
+    totalParticipants: int
+    score: float  # 0-100
+
+@profiled('run_ai_suggestion')
 def run_ai_suggestion_handler(req: https_fn.Request) -> https_fn.Response:
     """Handle AI scheduling suggestion requests (host only)"""
     try:
         # Verify authentication
         auth_header = req.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
-            return https_fn.Response(
-                json.dumps({"error": "Unauthorized"}),
-                status=401,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Unauthorized"}, status=401)
         
         token = auth_header.split('Bearer ')[1]
         decoded_token = auth.verify_id_token(token)
@@ -48,145 +96,250 @@ def run_ai_suggestion_handler(req: https_fn.Request) -> https_fn.Response:
         # Extract meeting ID from path
         path_parts = req.path.strip('/').split('/')
         if len(path_parts) < 2:
-            return https_fn.Response(
-                json.dumps({"error": "Meeting ID required"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Meeting ID required"}, status=400)
         
         meeting_id = path_parts[-1]
         
-        # Get meeting from Firestore
-        db = firestore.client()
-        meeting_ref = db.collection('meetings').document(meeting_id)
-        meeting_doc = meeting_ref.get()
+        # Read the meeting first; availabilities are only read for the host with credits left
+        def can_run_suggestion(meeting_data: dict) -> bool:
+            return (meeting_data.get('creatorUid') == user_uid
+                    and meeting_data.get('aiSuggestionsRemaining', 0) > 0)
         
-        if not meeting_doc.exists:
-            return https_fn.Response(
-                json.dumps({"error": "Meeting not found"}),
-                status=404,
-                headers={"Content-Type": "application/json"}
+        with span('firestore.fetch_meeting'):
+            meeting_doc, availabilities_docs = run_async(
+                fetch_meeting_with_availabilities(meeting_id, ['userName', 'schedule'], can_run_suggestion)
             )
         
+        if not meeting_doc.exists:
+            return json_response({"error": "Meeting not found"}, status=404)
+        
         meeting_data = meeting_doc.to_dict()
         
         # Check if user is the meeting creator
         if meeting_data.get('creatorUid') != user_uid:
-            return https_fn.Response(
-                json.dumps({"error": "Forbidden: Only meeting creator can run AI suggestion"}),
-                status=403,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Forbidden: Only meeting creator can run AI suggestion"}, status=403)
         
         # Check remaining AI suggestions
         ai_suggestions_remaining = meeting_data.get('aiSuggestionsRemaining', 0)
         if ai_suggestions_remaining <= 0:
-            return https_fn.Response(
-                json.dumps({"error": "No AI suggestions remaining"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "No AI suggestions remaining"}, status=400)
         
-        # Get participant availabilities
-        availabilities_ref = meeting_ref.collection('availabilities')
-        availabilities_docs = availabilities_ref.stream()
-        
-        participants = []
-        for doc in availabilities_docs:
-            participant_data = doc.to_dict()
-            
-            # Convert schedule to availability list
-            availability_list = []
-            schedule = participant_data.get('schedule', {})
-            for time_str, availability in schedule.items():
-                availability_list.append(AvailabilityItem(
-                    time=time_str,
-                    status=availability.get('status', 'unavailable'),
-                    comment=availability.get('comment', '')
-                ))
-            
-            participants.append(Participant(
-                name=participant_data.get('userName', ''),
-                availability=availability_list
-            ))
-        
-        if not participants:
-            return https_fn.Response(
-                json.dumps({"error": "No participants have submitted availability yet"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+        if not availabilities_docs:
+            return json_response({"error": "No participants have submitted availability yet"}, status=400)
         
-        # Parse request body for host instructions
+        # Parse request body for host instructions; the body itself is optional
         try:
             request_data = req.get_json() or {}
-            host_instructions = request_data.get('hostInstructions', '')
         except Exception:
-            host_instructions = ''
+            request_data = {}
+        if not isinstance(request_data, dict):
+            return json_response({"error": "Request body must be a JSON object"}, status=400)
         
-        # Prepare data for AI
-        time_slots = [ts.isoformat() if hasattr(ts, 'isoformat') else str(ts) 
-                     for ts in meeting_data.get('timeSlots', [])]
+        host_instructions = request_data.get('hostInstructions') or ''
+        mode = request_data.get('mode', 'auto')
+        if not isinstance(host_instructions, str) or mode not in SUGGESTION_MODES:
+            return json_response({"error": "Invalid hostInstructions or mode"}, status=400)
         
-        ai_input = AISchedulingInput(
-            meetingTitle=meeting_data.get('title', ''),
-            timeSlots=time_slots,
-            participants=participants,
-            hostInstructions=host_instructions
-        )
+        try:
+            candidate_count = parse_int_field(request_data, 'candidateCount', DEFAULT_CANDIDATE_COUNT)
+            chunk_size = parse_int_field(request_data, 'chunkSize', DEFAULT_CHUNK_SIZE)
+            parallelism = parse_int_field(request_data, 'parallelism', DEFAULT_CHUNK_PARALLELISM)
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=400)
+        candidate_count = max(1, min(candidate_count, MAX_CANDIDATE_COUNT))
+        chunk_size = max(MIN_CHUNK_SIZE, chunk_size)
+        parallelism = max(1, min(parallelism, MAX_CHUNK_PARALLELISM))
+        
+        meeting_ref = firestore.client().collection('meetings').document(meeting_id)
         
         # Call Gemini AI
         try:
-            ai_result = call_gemini_ai(ai_input)
+            ai_result = suggest_meeting_times(
+                meeting_ref, meeting_data, availabilities_docs, host_instructions,
+                candidate_count, mode, chunk_size, parallelism
+            )
         except Exception as e:
             logging.error(f"Error calling Gemini AI: {str(e)}")
-            return https_fn.Response(
-                json.dumps({"error": "AI processing failed"}),
-                status=500,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "AI processing failed"}, status=500)
         
-        # Update meeting with AI result
-        meeting_ref.update({
-            'status': 'confirmed',
-            'confirmedDateTime': ai_result.date,
-            'confirmedReason': ai_result.reason,
-            'aiSuggestionsRemaining': ai_suggestions_remaining - 1,
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
+        # Never confirm the parse-failure placeholder or charge a credit for it
+        if not ai_result.parsed:
+            return json_response({"error": "AI response could not be parsed. Please try again."}, status=502)
         
-        return https_fn.Response(
-            json.dumps({
+        # Confirm the top candidate and keep the rest so the host can switch without another model call
+        best = ai_result.candidates[0]
+        candidates = [candidate.model_dump() for candidate in ai_result.candidates]
+        with span('firestore.update_meeting'):
+            meeting_ref.update({
+                'status': 'confirmed',
+                'confirmedDateTime': best.date,
+                'confirmedReason': best.reason,
+                'bestSlot': best.date,
+                'aiCandidates': candidates,
+                'aiSuggestionsRemaining': ai_suggestions_remaining - 1,
+                'updatedAt': firestore.SERVER_TIMESTAMP
+            })
+        
+        return json_response(
+            {
                 "success": True,
                 "result": {
-                    "date": ai_result.date,
-                    "reason": ai_result.reason
+                    "date": best.date,
+                    "reason": best.reason
                 },
+                "candidates": candidates,
                 "message": "AI suggestion completed successfully"
-            }),
-            status=200,
-            headers={"Content-Type": "application/json"}
+            },
+            req=req
         )
         
     except auth.InvalidIdTokenError:
-        return https_fn.Response(
-            json.dumps({"error": "Invalid authentication token"}),
-            status=401,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Invalid authentication token"}, status=401)
     except Exception as e:
         logging.error(f"Error running AI suggestion: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Internal server error"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
+        return json_response({"error": "Internal server error"}, status=500)
+
+def parse_int_field(data: dict, field: str, default: int) -> int:
+    """Read an optional integer request field; raises ValueError for anything that is not an integer"""
+    if field not in data:
+        return default
+    value = data[field]
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{field} must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an integer") from None
+
+def suggest_meeting_times(meeting_ref, meeting_data: dict, availability_docs, host_instructions: str = '',
+                          candidate_count: int = DEFAULT_CANDIDATE_COUNT, mode: str = 'auto',
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          parallelism: int = DEFAULT_CHUNK_PARALLELISM) -> AISchedulingResult:
+    """Run the single-prompt or chunked suggestion path for a meeting's availabilities"""
+    availability_docs = sorted(availability_docs, key=lambda doc: doc.id)
+    participants = build_participants(doc.to_dict() for doc in availability_docs)
+    chunked = mode == 'chunked' or (mode == 'auto' and len(participants) > CHUNKED_MODE_THRESHOLD)
+    
+    # Prepare data for AI
+    time_slots = meeting_slot_keys(meeting_data)
+    meeting_title = meeting_data.get('title', '')
+    
+    if chunked:
+        chunks = assign_chunks(availability_docs, participants, chunk_size)
+        digests = summarize_chunks(meeting_ref, chunks, time_slots, parallelism)
+        return call_gemini_ai_with_digests(
+            meeting_title, merge_chunk_digests(digests, time_slots),
+            len(participants), host_instructions, candidate_count
+        )
+    
+    ai_input = AISchedulingInput(
+        meetingTitle=meeting_title,
+        timeSlots=time_slots,
+        participants=participants,
+        hostInstructions=host_instructions
+    )
+    return call_gemini_ai(ai_input, candidate_count)
+
+def chunk_bucket_count(participant_count: int, chunk_size: int) -> int:
+    """Smallest power of two giving buckets of at most chunk_size participants on average.
+
+    Rounding up to a power of two means the bucket count, and with it every
+    chunk's membership, only changes when the meeting doubles in size.
+    """
+    buckets = 1
+    while buckets * chunk_size < participant_count:
+        buckets *= 2
+    return buckets
+
+def assign_chunks(availability_docs, participants: List[Participant], chunk_size: int):
+    """Group participants into chunks by a stable hash of their user id.
+
+    A new or edited participant only changes the chunk it hashes into, so
+    the cached digests of every other chunk stay valid. Returns a list of
+    (availability_docs, participants) pairs, each ordered by user id.
+    """
+    bucket_count = chunk_bucket_count(len(participants), chunk_size)
+    buckets: Dict[int, tuple] = {}
+    for doc, participant in sorted(zip(availability_docs, participants), key=lambda pair: pair[0].id):
+        bucket = int(hashlib.sha256(doc.id.encode()).hexdigest()[:8], 16) % bucket_count
+        chunk_docs, chunk_participants = buckets.setdefault(bucket, ([], []))
+        chunk_docs.append(doc)
+        chunk_participants.append(participant)
+    return [buckets[bucket] for bucket in sorted(buckets)]
+
+def build_participants(availability_docs) -> List[Participant]:
+    """Convert availability documents ({userName, schedule}) into Participant models"""
+    participants = []
+    for participant_data in availability_docs:
+        # Convert schedule to availability list
+        availability_list = []
+        schedule = participant_data.get('schedule', {})
+        for time_str, availability in schedule.items():
+            availability_list.append(AvailabilityItem(
+                time=time_str,
+                status=availability.get('status', 'unavailable'),
+                comment=availability.get('comment', '')
+            ))
+        
+        participants.append(Participant(
+            name=participant_data.get('userName', ''),
+            availability=availability_list
+        ))
+    return participants
+
+def score_time_slots(time_slots: List[str], participants: List[Participant]) -> List[SlotScore]:
+    """Score slots like the manage page: available counts double, maybe counts once.
+    
+    Returns scores sorted best first; ties keep the original slot order.
+    """
+    counts = {time_slot: {'available': 0, 'maybe': 0, 'unavailable': 0} for time_slot in time_slots}
+    for participant in participants:
+        for avail in participant.availability:
+            slot_counts = counts.get(avail.time)
+            if slot_counts is not None and avail.status in slot_counts:
+                slot_counts[avail.status] += 1
+    
+    total = len(participants)
+    scores = [
+        SlotScore(
+            time=time_slot,
+            availableCount=c['available'],
+            maybeCount=c['maybe'],
+            unavailableCount=c['unavailable'],
+            totalParticipants=total,
+            score=(c['available'] * 2 + c['maybe']) / (total * 2) * 100 if total else 0.0
         )
+        for time_slot, c in counts.items()
+    ]
+    return sorted(scores, key=lambda slot: slot.score, reverse=True)
 
-def call_gemini_ai(ai_input: AISchedulingInput) -> AISchedulingResult:
-    """Call Gemini AI to get scheduling suggestions"""
+def pick_slot_with_required(scores: List[SlotScore], participants: List[Participant],
+                            required_names: List[str]) -> Optional[SlotScore]:
+    """Return the best-scoring slot where every required attendee is available"""
+    required = set(required_names)
+    available_by_slot: Dict[str, set] = {}
+    for participant in participants:
+        if participant.name not in required:
+            continue
+        for avail in participant.availability:
+            if avail.status == 'available':
+                available_by_slot.setdefault(avail.time, set()).add(participant.name)
+    
+    for slot in scores:
+        if available_by_slot.get(slot.time, set()) >= required:
+            return slot
+    return None
+
+def call_gemini_ai(ai_input: AISchedulingInput, candidate_count: int = DEFAULT_CANDIDATE_COUNT,
+                   model=None) -> AISchedulingResult:
+    """Call Gemini AI to get a ranked list of scheduling suggestions.
+    
+    model can be any object with a generate_content(prompt) method returning
+    a response with .text; offline replays pass a stub here.
+    """
     
     prompt = f"""
-あなたは優秀なアシスタントです。以下のミーティング参加者の空き状況と制約条件を考慮し、最も最適なミーティング日時を1つ提案してください。
+あなたは優秀なアシスタントです。以下のミーティング参加者の空き状況と制約条件を考慮し、最適なミーティング日時の候補を良い順に{candidate_count}つ提案してください。
 
 全員が参加できることを最優先とします。もし全員の参加が難しい場合は、より多くの人が参加できる時間を優先してください。
 
@@ -200,36 +353,45 @@ def call_gemini_ai(ai_input: AISchedulingInput) -> AISchedulingResult:
 ホストからの追加指示:
 {ai_input.hostInstructions or "特になし"}
 
-なぜその時間が最適なのか、誰が参加できないのかを明確にして理由を説明してください。
+各候補について、なぜその時間が適しているのかを説明し、参加できない人の名前を挙げてください。
 
-出力は以下のJSON形式で厳密に返してください:
+出力は以下のJSON形式で厳密に返してください（candidatesは最適なものから順に並べる）:
 {{
-    "date": "2024-01-15T14:30:00+09:00",
-    "reason": "この時間が最適な理由の詳細な説明"
+    "candidates": [
+        {{
+            "date": "2024-01-15T14:30:00+09:00",
+            "reason": "この時間が適している理由の詳細な説明",
+            "unavailable": ["参加できない人の名前"]
+        }}
+    ]
 }}
 """
     
-    model = genai.GenerativeModel('gemini-pro')
-    response = model.generate_content(prompt)
+    return generate_candidates(prompt, candidate_count, ai_input.timeSlots, model)
+
+def generate_candidates(prompt: str, candidate_count: int, time_slots: List[str], model=None) -> AISchedulingResult:
+    """Send a scheduling prompt and parse the ranked candidates it returns"""
+    model = model or genai.GenerativeModel('gemini-pro')
+    with span('gemini.generate_content'):
+        response = model.generate_content(prompt)
     
     try:
         # Parse JSON response
-        response_text = response.text.strip()
-        if response_text.startswith('```json'):
-            response_text = response_text[7:-3]
-        elif response_text.startswith('```'):
-            response_text = response_text[3:-3]
-        
-        response_json = json.loads(response_text)
-        return AISchedulingResult(**response_json)
+        response_json = parse_json_response(response.text)
+        result = AISchedulingResult(**response_json)
+        result.parsed = True
+        if not result.candidates:
+            raise ValueError("AI response contained no candidates")
+        result.candidates = result.candidates[:candidate_count]
+        return result
     
-    except (json.JSONDecodeError, ValidationError) as e:
+    except (json.JSONDecodeError, ValidationError, ValueError) as e:
         logging.error(f"Error parsing AI response: {str(e)}, Response: {response.text}")
         # Fallback: create a basic response
-        return AISchedulingResult(
-            date=ai_input.timeSlots[0] if ai_input.timeSlots else "2024-01-01T00:00:00+09:00",
+        return AISchedulingResult(candidates=[AISchedulingCandidate(
+            date=time_slots[0] if time_slots else "2024-01-01T00:00:00+09:00",
             reason="AI response could not be parsed. Please try again."
-        )
+        )], parsed=False)
 
 def format_participants_for_prompt(participants: List[Participant]) -> str:
     """Format participants data for AI prompt"""
@@ -250,4 +412,204 @@ def format_participants_for_prompt(participants: List[Participant]) -> str:
         
         formatted.append(participant_text)
     
-    return '\n'.join(formatted)
\ No newline at end of file
+    return '\n'.join(formatted)
+
+def parse_json_response(text: str) -> dict:
+    """Strip an optional Markdown code fence and parse the model's JSON output"""
+    response_text = text.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:-3]
+    elif response_text.startswith('```'):
+        response_text = response_text[3:-3]
+    return json.loads(response_text)
+
+def chunk_cache_key(chunk_docs, time_slots: List[str]) -> str:
+    """Hash a chunk's participants and the meeting's slots; any change yields a new key"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(time_slots).encode())
+    for doc in chunk_docs:
+        data = doc.to_dict()
+        digest.update(json.dumps([doc.id, data.get('userName', ''), data.get('schedule', {})],
+                                 sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def summarize_chunks(meeting_ref, chunks, time_slots: List[str], parallelism: int) -> List[ChunkDigest]:
+    """Map step: build a digest per participant chunk, reusing cached digests.
+    
+    chunks is a list of (availability_docs, participants) pairs. Digests are
+    cached in the meeting's aiChunkDigests subcollection keyed by content, so
+    only chunks whose participants changed are summarized again. Cached
+    digests that no current chunk uses are deleted.
+    """
+    cache_ref = meeting_ref.collection('aiChunkDigests')
+    keys = [chunk_cache_key(chunk_docs, time_slots) for chunk_docs, _ in chunks]
+    
+    db = firestore.client()
+    with span('firestore.read_chunk_digests'):
+        cached = {
+            doc.id: ChunkDigest(**doc.to_dict()['digest'])
+            for doc in db.get_all([cache_ref.document(key) for key in set(keys)])
+            if doc.exists
+        }
+    
+    missing = [(key, participants) for key, (_, participants) in zip(keys, chunks) if key not in cached]
+    fresh: Dict[str, ChunkDigest] = {}
+    if missing:
+        # Copy the request context into each worker so profiling spans are still recorded
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            futures = [
+                (key, executor.submit(contextvars.copy_context().run, summarize_chunk, participants, time_slots))
+                for key, participants in missing
+            ]
+            fresh = {key: future.result() for key, future in futures}
+        cached.update(fresh)
+    
+    # Fallback digests are used for this request only, so the chunk is retried next time
+    writes = [
+        (cache_ref.document(key), {
+            'digest': digest.model_dump(exclude={'complete'}),
+            'createdAt': firestore.SERVER_TIMESTAMP,
+        })
+        for key, digest in fresh.items() if digest.complete
+    ]
+    current_keys = set(keys)
+    with span('firestore.list_chunk_digests'):
+        writes.extend((ref, None) for ref in cache_ref.list_documents() if ref.id not in current_keys)
+    
+    with span('firestore.write_chunk_digests'):
+        for start in range(0, len(writes), DIGEST_WRITE_BATCH_SIZE):
+            batch = db.batch()
+            for ref, data in writes[start:start + DIGEST_WRITE_BATCH_SIZE]:
+                if data is None:
+                    batch.delete(ref)
+                else:
+                    batch.set(ref, data)
+            batch.commit()
+    
+    return [cached[key] for key in keys]
+
+def summarize_chunk(participants: List[Participant], time_slots: List[str], model=None) -> ChunkDigest:
+    """Reduce one chunk of participants to per-slot counts, names and condition notes.
+    
+    Counts and names are tallied locally; the model is only asked to condense
+    'maybe' comments, and is skipped when the chunk has none. If the model
+    call or its output fails, the raw comments are kept and the digest is
+    marked incomplete instead of failing the whole suggestion.
+    """
+    slots = {time_slot: SlotDigest(time=time_slot) for time_slot in time_slots}
+    comments: Dict[str, List[str]] = {}
+    for participant in participants:
+        for avail in participant.availability:
+            slot = slots.get(avail.time)
+            if slot is None:
+                continue
+            if avail.status == 'available':
+                slot.available += 1
+            elif avail.status == 'maybe':
+                slot.maybe += 1
+                if avail.comment:
+                    comments.setdefault(avail.time, []).append(f"{participant.name}: {avail.comment}")
+            else:
+                slot.unavailable += 1
+                slot.unavailableNames.append(participant.name)
+    
+    complete = True
+    if comments:
+        prompt = f"""
+以下は会議の候補時間ごとの「条件付き参加可能」な参加者のコメントです。候補時間ごとに、日程決定に影響する条件を短い箇条書きに要約してください。
+
+{chr(10).join(f"- {time_slot}: {' / '.join(texts)}" for time_slot, texts in comments.items())}
+
+出力は以下のJSON形式で厳密に返してください:
+{{
+    "notes": {{
+        "2024-01-15T05:30:00.000Z": ["条件の要約"]
+    }}
+}}
+"""
+        try:
+            model = model or genai.GenerativeModel('gemini-pro')
+            with span('gemini.chunk_digest'):
+                response = model.generate_content(prompt)
+            notes_by_slot = {}
+            for time_slot, notes in parse_json_response(response.text).get('notes', {}).items():
+                if time_slot in slots:
+                    notes_by_slot[time_slot] = [str(note) for note in notes]
+            for time_slot, notes in notes_by_slot.items():
+                slots[time_slot].notes = notes
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            logging.error(f"Error parsing chunk digest: {str(e)}")
+            complete = False
+        except Exception as e:
+            logging.error(f"Error calling Gemini AI for chunk digest: {str(e)}")
+            complete = False
+        
+        if not complete:
+            # Fall back to the raw comments so no constraint is lost
+            for time_slot, texts in comments.items():
+                slots[time_slot].notes = texts
+    
+    return ChunkDigest(slots=list(slots.values()), complete=complete)
+
+def merge_chunk_digests(digests: List[ChunkDigest], time_slots: List[str]) -> List[SlotDigest]:
+    """Reduce step: combine chunk digests into one digest per slot"""
+    merged = {time_slot: SlotDigest(time=time_slot) for time_slot in time_slots}
+    for digest in digests:
+        for slot in digest.slots:
+            target = merged.get(slot.time)
+            if target is None:
+                continue
+            target.available += slot.available
+            target.maybe += slot.maybe
+            target.unavailable += slot.unavailable
+            target.unavailableNames.extend(slot.unavailableNames)
+            target.notes.extend(slot.notes)
+    return list(merged.values())
+
+def call_gemini_ai_with_digests(meeting_title: str, slot_digests: List[SlotDigest], total_participants: int,
+                                host_instructions: str, candidate_count: int = DEFAULT_CANDIDATE_COUNT,
+                                model=None) -> AISchedulingResult:
+    """Pick ranked candidates from merged slot digests with one small model call"""
+    ranked = sorted(slot_digests, key=lambda slot: slot.available * 2 + slot.maybe, reverse=True)
+    ranked = ranked[:max(DIGEST_PROMPT_SLOTS, candidate_count)]
+    
+    lines = []
+    for slot in ranked:
+        names = ', '.join(slot.unavailableNames[:MAX_DIGEST_NAMES])
+        if len(slot.unavailableNames) > MAX_DIGEST_NAMES:
+            names += f" 他{len(slot.unavailableNames) - MAX_DIGEST_NAMES}名"
+        line = f"- {slot.time}: 参加可能 {slot.available}名, 条件付き {slot.maybe}名, 参加不可 {slot.unavailable}名"
+        if names:
+            line += f"\n  参加不可: {names}"
+        if slot.notes:
+            line += f"\n  条件: {'; '.join(slot.notes)}"
+        lines.append(line)
+    
+    prompt = f"""
+あなたは優秀なアシスタントです。参加者{total_participants}名のミーティングについて、候補時間ごとの集計と条件を考慮し、最適なミーティング日時の候補を良い順に{candidate_count}つ提案してください。
+
+全員が参加できることを最優先とします。もし全員の参加が難しい場合は、より多くの人が参加できる時間を優先してください。
+
+ミーティング情報:
+- タイトル: {meeting_title}
+
+候補時間ごとの集計（参加可能人数の多い順）:
+{chr(10).join(lines)}
+
+ホストからの追加指示:
+{host_instructions or "特になし"}
+
+各候補について、なぜその時間が適しているのかを説明し、参加できない人の名前を挙げてください。
+
+出力は以下のJSON形式で厳密に返してください（candidatesは最適なものから順に並べる）:
+{{
+    "candidates": [
+        {{
+            "date": "2024-01-15T14:30:00+09:00",
+            "reason": "この時間が適している理由の詳細な説明",
+            "unavailable": ["参加できない人の名前"]
+        }}
+    ]
+}}
+"""
+    return generate_candidates(prompt, candidate_count, [slot.time for slot in ranked], model)
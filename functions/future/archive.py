@@ -0,0 +1,188 @@
+from firebase_admin import firestore
+import json
+import logging
+import os
+import zlib
+from typing import List, Optional
+from future.responses import to_json_value
+from future.time_slots import parse_slot
+
+ARCHIVE_STATUSES = ['confirmed', 'canceled']
+ARCHIVE_DOCUMENT = 'availabilities'
+ARCHIVE_ENCODING = 'zlib+json-columnar-v1'
+# Stay well under Firestore's 1 MiB document limit
+MAX_ARCHIVE_BYTES = 900 * 1024
+# Firestore rejects batches with more than 500 writes
+WRITE_BATCH_SIZE = 500
+COMPACTION_PAGE_SIZE = int(os.getenv('ARCHIVE_COMPACTION_PAGE_SIZE', '50'))
+
+# One character per schedule cell; '-' means the participant left the slot blank
+STATUS_CODES = {'available': 'a', 'maybe': 'm', 'unavailable': 'u'}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+class ArchivedAvailability:
+    """Read-only stand-in for an availability snapshot restored from an archive"""
+    def __init__(self, user_id: str, data: dict):
+        self.id = user_id
+        self._data = data
+        self.exists = True
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+def build_archive(availability_docs) -> bytes:
+    """Fold availability documents into one compressed columnar blob.
+
+    Each participant's schedule becomes a string with one status code per
+    slot; comments and any other per-cell fields are kept in a sparse map.
+    """
+    rows = [(doc.id, doc.to_dict()) for doc in availability_docs]
+    slots = sorted({slot for _, data in rows for slot in data.get('schedule', {})})
+    slot_index = {slot: i for i, slot in enumerate(slots)}
+
+    statuses = []
+    cells = {}
+    for row_index, (_, data) in enumerate(rows):
+        codes = ['-'] * len(slots)
+        for slot, availability in data.get('schedule', {}).items():
+            availability = availability or {}
+            codes[slot_index[slot]] = STATUS_CODES.get(availability.get('status'), 'u')
+            extra = {k: v for k, v in availability.items() if k != 'status'}
+            if extra:
+                cells[f"{row_index}:{slot_index[slot]}"] = extra
+        statuses.append(''.join(codes))
+
+    columns = {
+        'slots': slots,
+        'userIds': [user_id for user_id, _ in rows],
+        'userNames': [data.get('userName', '') for _, data in rows],
+        'revisions': [data.get('revision', 0) for _, data in rows],
+        'submittedAt': [data.get('submittedAt') for _, data in rows],
+        'statuses': statuses,
+        'cells': cells,
+    }
+    raw = json.dumps(columns, default=to_json_value, ensure_ascii=False, separators=(',', ':'))
+    return zlib.compress(raw.encode('utf-8'), 9)
+
+def read_archive(archive_data: dict, fields: Optional[List[str]] = None) -> List[ArchivedAvailability]:
+    """Expand an archive document back into per-participant availability records"""
+    columns = json.loads(zlib.decompress(archive_data['data']))
+    slots = columns['slots']
+    cells = columns['cells']
+
+    participants = []
+    for row_index, user_id in enumerate(columns['userIds']):
+        schedule = {}
+        for slot_index, code in enumerate(columns['statuses'][row_index]):
+            if code == '-':
+                continue
+            availability = {'status': STATUS_NAMES[code]}
+            availability.update(cells.get(f"{row_index}:{slot_index}", {}))
+            schedule[slots[slot_index]] = availability
+
+        submitted_at = columns['submittedAt'][row_index]
+        data = {
+            'userId': user_id,
+            'userName': columns['userNames'][row_index],
+            'schedule': schedule,
+            'revision': columns['revisions'][row_index],
+            'submittedAt': parse_slot(submitted_at) if submitted_at else None,
+        }
+        if fields:
+            data = {k: v for k, v in data.items() if k in fields}
+        participants.append(ArchivedAvailability(user_id, data))
+    return participants
+
+def compact_meeting(db, meeting_ref) -> bool:
+    """Archive one finished meeting's availabilities and delete the originals.
+
+    The archive is written and the meeting flagged before anything is
+    deleted, so readers never see a meeting without its responses. The app
+    reads archived meetings through getMeeting, which serves the archive.
+    """
+    availabilities_ref = meeting_ref.collection('availabilities')
+    availability_docs = list(availabilities_ref.stream())
+
+    blob = build_archive(availability_docs)
+    if len(blob) > MAX_ARCHIVE_BYTES:
+        logging.warning(f"Archive for meeting {meeting_ref.id} is {len(blob)} bytes; leaving it uncompacted")
+        return False
+
+    batch = db.batch()
+    batch.set(meeting_ref.collection('archive').document(ARCHIVE_DOCUMENT), {
+        'data': blob,
+        'encoding': ARCHIVE_ENCODING,
+        'participantCount': len(availability_docs),
+        'createdAt': firestore.SERVER_TIMESTAMP,
+    })
+    batch.update(meeting_ref, {
+        'archived': True,
+        'archivedAt': firestore.SERVER_TIMESTAMP,
+    })
+    batch.commit()
+
+    for start in range(0, len(availability_docs), WRITE_BATCH_SIZE):
+        batch = db.batch()
+        for doc in availability_docs[start:start + WRITE_BATCH_SIZE]:
+            batch.delete(doc.reference)
+        batch.commit()
+    return True
+
+def unarchive_meeting(db, meeting_ref, update_data: dict) -> None:
+    """Apply a meeting update that reopens it, restoring its availabilities from the archive.
+
+    The documents are restored before the flag is cleared, so readers always
+    see the responses through either the archive or the subcollection.
+    """
+    archive_ref = meeting_ref.collection('archive').document(ARCHIVE_DOCUMENT)
+    archive_doc = archive_ref.get()
+    restored = read_archive(archive_doc.to_dict()) if archive_doc.exists else []
+    availabilities_ref = meeting_ref.collection('availabilities')
+    for start in range(0, len(restored), WRITE_BATCH_SIZE):
+        batch = db.batch()
+        for participant in restored[start:start + WRITE_BATCH_SIZE]:
+            # Already counted when first submitted, so the respondent trigger must not count it again
+            batch.set(availabilities_ref.document(participant.id),
+                      {**participant.to_dict(), 'respondentCounted': True})
+        batch.commit()
+
+    batch = db.batch()
+    batch.update(meeting_ref, {**update_data, 'archived': False, 'archivedAt': firestore.DELETE_FIELD})
+    batch.delete(archive_ref)
+    batch.commit()
+
+def compact_finished_meetings(db=None, page_size: int = COMPACTION_PAGE_SIZE) -> int:
+    """Compact every confirmed or canceled meeting that has not been archived yet.
+
+    Meetings created by the app and older meetings have no archived field,
+    so an equality filter on it would miss them; the flag is checked per
+    document instead.
+    """
+    db = db or firestore.client()
+    query = (db.collection('meetings')
+             .where('status', 'in', ARCHIVE_STATUSES)
+             .select(['archived'])
+             .limit(page_size))
+
+    compacted = 0
+    last_doc = None
+    while True:
+        page_query = query.start_after(last_doc) if last_doc else query
+        docs = list(page_query.stream())
+        if not docs:
+            break
+
+        for doc in docs:
+            if (doc.to_dict() or {}).get('archived') is True:
+                continue
+            try:
+                compacted += compact_meeting(db, doc.reference)
+            except Exception as e:
+                logging.error(f"Error compacting meeting {doc.id}: {str(e)}")
+
+        last_doc = docs[-1]
+        if len(docs) < page_size:
+            break
+
+    logging.info(f"Compacted {compacted} finished meetings")
+    return compacted
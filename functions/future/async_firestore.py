@@ -0,0 +1,62 @@
+from firebase_admin import firestore_async
+import asyncio
+import threading
+from typing import Callable, List, Optional
+from future.archive import ARCHIVE_DOCUMENT, read_archive
+
+# The async client's gRPC channel is bound to the loop it was first used on, so
+# every request runs its coroutines on one long-lived loop in a background thread.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='firestore-async', daemon=True).start()
+        return _loop
+
+def run_async(coro):
+    """Run a coroutine on the shared Firestore loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+async def fetch_meeting_with_availabilities(meeting_id: str, availability_fields: Optional[List[str]] = None,
+                                            should_read_availabilities: Optional[Callable[[dict], bool]] = None):
+    """Read a meeting document and its availabilities concurrently.
+    
+    Returns (meeting_snapshot, availability_snapshots). When availability_fields
+    is given, the availability query only returns those fields. For archived
+    meetings, participants from the compacted archive document are merged in,
+    with live documents taking precedence.
+    
+    When should_read_availabilities is given, the meeting is read first and the
+    availabilities only if it returns True for the meeting data; otherwise the
+    availability list is empty. This trades the concurrent read for not paying
+    for N availability reads on requests that will be rejected.
+    """
+    db = firestore_async.client()
+    meeting_ref = db.collection('meetings').document(meeting_id)
+    availabilities_query = meeting_ref.collection('availabilities')
+    if availability_fields:
+        availabilities_query = availabilities_query.select(availability_fields)
+    
+    if should_read_availabilities is None:
+        meeting_doc, availability_docs = await asyncio.gather(
+            meeting_ref.get(),
+            availabilities_query.get(),
+        )
+    else:
+        meeting_doc = await meeting_ref.get()
+        if not meeting_doc.exists or not should_read_availabilities(meeting_doc.to_dict() or {}):
+            return meeting_doc, []
+        availability_docs = await availabilities_query.get()
+    
+    # Only archived meetings pay for the extra round trip
+    if meeting_doc.exists and (meeting_doc.to_dict() or {}).get('archived') is True:
+        archive_doc = await meeting_ref.collection('archive').document(ARCHIVE_DOCUMENT).get()
+        if archive_doc.exists:
+            merged = {doc.id: doc for doc in read_archive(archive_doc.to_dict(), availability_fields)}
+            merged.update((doc.id, doc) for doc in availability_docs)
+            availability_docs = list(merged.values())
+    return meeting_doc, availability_docs
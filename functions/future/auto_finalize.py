@@ -0,0 +1,132 @@
+from firebase_admin import firestore
+import logging
+from typing import List, Tuple
+from future.ai_suggestion import (
+    AISchedulingCandidate, AISchedulingResult, DEFAULT_CANDIDATE_COUNT, Participant,
+    build_participants, score_time_slots, suggest_meeting_times,
+)
+from future.async_firestore import run_async, fetch_meeting_with_availabilities
+from future.time_slots import meeting_slot_keys
+
+# Meeting fields the response tracker needs inside its transaction
+TRACKING_FIELDS = ['status', 'expectedInviteeCount', 'expectedInvitees', 'respondedInvitees']
+
+def invitee_response_update(meeting_data: dict, user_id: str, user_name: str) -> Tuple[dict, bool]:
+    """Build the meeting update that marks an invitee as responded.
+
+    Returns (update_data, quorum_reached). The status flips from 'scheduling'
+    to 'finalizing' in the caller's transaction, so duplicate or concurrent
+    trigger deliveries finalize a meeting only once.
+    """
+    expected_count = meeting_data.get('expectedInviteeCount')
+    if meeting_data.get('status') != 'scheduling' or not expected_count:
+        return {}, False
+
+    # With a named invitee list, only listed people (by uid or name) count toward the quorum
+    expected = meeting_data.get('expectedInvitees') or []
+    if expected:
+        if user_id in expected:
+            invitee = user_id
+        elif user_name in expected:
+            invitee = user_name
+        else:
+            return {}, False
+    else:
+        invitee = user_id
+
+    responded = meeting_data.get('respondedInvitees') or []
+    if invitee in responded:
+        return {}, False
+
+    responded = responded + [invitee]
+    update_data = {'respondedInvitees': responded}
+    quorum_reached = len(responded) >= expected_count
+    if quorum_reached:
+        update_data['status'] = 'finalizing'
+    return update_data, quorum_reached
+
+def score_candidates(time_slots: List[str], participants: List[Participant],
+                     candidate_count: int = DEFAULT_CANDIDATE_COUNT) -> AISchedulingResult:
+    """Build ranked candidates from the weighted score when the model is not used"""
+    unavailable_by_slot = {}
+    for participant in participants:
+        for avail in participant.availability:
+            if avail.status == 'unavailable':
+                unavailable_by_slot.setdefault(avail.time, []).append(participant.name)
+
+    candidates = [
+        AISchedulingCandidate(
+            date=slot.time,
+            reason=(f"{slot.totalParticipants}名中{slot.availableCount}名が参加可能、"
+                    f"{slot.maybeCount}名が条件付き参加可能です（スコア {slot.score:.1f}%）。"),
+            unavailable=unavailable_by_slot.get(slot.time, [])
+        )
+        for slot in score_time_slots(time_slots, participants)[:candidate_count]
+    ]
+    return AISchedulingResult(candidates=candidates)
+
+def finalize_meeting(meeting_id: str, finalized_by: str = 'quorum', fallback_status: str = 'scheduling') -> None:
+    """Pick and confirm a time for a meeting that was claimed for finalization.
+    
+    fallback_status is restored if anything fails, so the host can still decide.
+    """
+    meeting_ref = firestore.client().collection('meetings').document(meeting_id)
+    try:
+        meeting_doc, availability_docs = run_async(
+            fetch_meeting_with_availabilities(meeting_id, ['userName', 'schedule'])
+        )
+        meeting_data = meeting_doc.to_dict()
+        ai_suggestions_remaining = meeting_data.get('aiSuggestionsRemaining', 0)
+
+        # Use an AI suggestion if the host has one left; otherwise, or if the model fails, fall back to scoring
+        ai_result = None
+        if ai_suggestions_remaining > 0:
+            try:
+                ai_result = suggest_meeting_times(meeting_ref, meeting_data, availability_docs)
+                if ai_result.parsed:
+                    ai_suggestions_remaining -= 1
+                else:
+                    # Never confirm the parse-failure placeholder or charge a credit for it
+                    logging.error(f"Unparseable AI response for meeting {meeting_id}; using scores")
+                    ai_result = None
+            except Exception as e:
+                logging.error(f"Error calling Gemini AI for meeting {meeting_id}: {str(e)}")
+        if ai_result is None:
+            participants = build_participants(doc.to_dict() for doc in availability_docs)
+            ai_result = score_candidates(meeting_slot_keys(meeting_data), participants)
+
+        if not ai_result.candidates:
+            raise ValueError("No candidate time slots")
+
+        best = ai_result.candidates[0]
+        meeting_ref.update({
+            'status': 'confirmed',
+            'confirmedDateTime': best.date,
+            'confirmedReason': best.reason,
+            'bestSlot': best.date,
+            'aiCandidates': [candidate.model_dump() for candidate in ai_result.candidates],
+            'aiSuggestionsRemaining': ai_suggestions_remaining,
+            'finalizedBy': finalized_by,
+            'updatedAt': firestore.SERVER_TIMESTAMP
+        })
+    except Exception as e:
+        # Hand the meeting back to the host rather than leaving it stuck in 'finalizing'
+        logging.error(f"Error finalizing meeting {meeting_id}: {str(e)}")
+        meeting_ref.update({'status': fallback_status, 'updatedAt': firestore.SERVER_TIMESTAMP})
+
+@firestore.transactional
+def claim_closed_meeting(transaction, meeting_ref) -> bool:
+    """Move a deadline-closed meeting to 'finalizing' so a queue entry is processed only once"""
+    snapshot = meeting_ref.get(field_paths=['status'], transaction=transaction)
+    if not snapshot.exists or snapshot.to_dict().get('status') != 'closed':
+        return False
+    transaction.update(meeting_ref, {'status': 'finalizing'})
+    return True
+
+def handle_scoring_queued(meeting_id: str) -> None:
+    """Score a meeting the deadline sweeper queued, then drop its queue entry"""
+    db = firestore.client()
+    meeting_ref = db.collection('meetings').document(meeting_id)
+    if claim_closed_meeting(db.transaction(), meeting_ref):
+        finalize_meeting(meeting_id, finalized_by='deadline', fallback_status='closed')
+    db.collection('scoringQueue').document(meeting_id).delete()
@@ -1,7 +1,10 @@
 from firebase_functions import https_fn
 from firebase_admin import firestore, auth
-import json
 import logging
+from future.responses import json_response
+from future.deadline_sweeper import parse_deadline
+from future.time_slots import SlotRule, iter_rule_slots, parse_slot
+from pydantic import ValidationError
 
 def create_meeting_handler(req: https_fn.Request) -> https_fn.Response:
     """Handle meeting creation requests"""
@@ -9,11 +12,7 @@ def create_meeting_handler(req: https_fn.Request) -> https_fn.Response:
         # Verify authentication
         auth_header = req.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
-            return https_fn.Response(
-                json.dumps({"error": "Unauthorized"}),
-                status=401,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Unauthorized"}, status=401)
         
         token = auth_header.split('Bearer ')[1]
         decoded_token = auth.verify_id_token(token)
@@ -23,61 +22,88 @@ def create_meeting_handler(req: https_fn.Request) -> https_fn.Response:
         try:
             data = req.get_json()
         except Exception:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid JSON"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Validate required fields
-        required_fields = ['title', 'timeSlots', 'deadline']
+        required_fields = ['title', 'deadline']
         for field in required_fields:
             if field not in data:
-                return https_fn.Response(
-                    json.dumps({"error": f"Missing required field: {field}"}),
-                    status=400,
-                    headers={"Content-Type": "application/json"}
-                )
+                return json_response({"error": f"Missing required field: {field}"}, status=400)
+        
+        if 'slotRule' not in data and 'timeSlots' not in data:
+            return json_response({"error": "Missing required field: slotRule or timeSlots"}, status=400)
+        
+        # A slot rule is stored as is and expanded lazily by readers, so the
+        # document size does not grow with the grid resolution
+        slot_fields = {}
+        try:
+            if 'slotRule' in data:
+                slot_rule = SlotRule(**data['slotRule'])
+                if next(iter_rule_slots(slot_rule), None) is None:
+                    raise ValueError("Slot rule produces no time slots")
+                slot_fields['slotRule'] = slot_rule.model_dump()
+            else:
+                slot_fields['timeSlots'] = [parse_slot(ts) for ts in data['timeSlots']]
+        except (TypeError, ValueError, ValidationError) as e:
+            return json_response({"error": f"Invalid time slots: {str(e)}"}, status=400)
+        
+        # Store the deadline as a timestamp so the (status, deadline) index can range over it
+        try:
+            deadline = parse_deadline(data['deadline'])
+        except (TypeError, ValueError):
+            return json_response({"error": "Invalid deadline format"}, status=400)
+        
+        # Optional quorum: a number of responses, or a list of invitee uids/names
+        expected_invitees = data.get('expectedInvitees')
+        if isinstance(expected_invitees, list) and all(isinstance(i, str) for i in expected_invitees):
+            expected_fields = {
+                'expectedInvitees': sorted(set(expected_invitees)),
+                'expectedInviteeCount': len(set(expected_invitees)),
+            }
+        elif isinstance(expected_invitees, int) and not isinstance(expected_invitees, bool) and expected_invitees >= 0:
+            expected_fields = {'expectedInvitees': [], 'expectedInviteeCount': expected_invitees}
+        elif expected_invitees is None:
+            expected_fields = {'expectedInvitees': [], 'expectedInviteeCount': 0}
+        else:
+            return json_response({"error": "expectedInvitees must be a count or a list of names"}, status=400)
         
         # Create meeting document
         db = firestore.client()
         meeting_data = {
             'title': data['title'],
             'description': data.get('description', ''),
-            'timeSlots': [firestore.SERVER_TIMESTAMP] * len(data['timeSlots']),  # Placeholder
-            'deadline': data['deadline'],
+            'deadline': deadline,
             'creatorUid': user_uid,
             'status': 'scheduling',
             'confirmedDateTime': None,
             'confirmedReason': None,
             'createdAt': firestore.SERVER_TIMESTAMP,
             'aiSuggestionsRemaining': 2,
+            'respondentCount': 0,
+            'bestSlot': None,
+            'slotCounts': {},
+            'archived': False,
+            'respondedInvitees': [],
+            **expected_fields,
+            **slot_fields,
         }
         
         # Add the meeting to Firestore
         meeting_ref = db.collection('meetings').add(meeting_data)
         meeting_id = meeting_ref[1].id
         
-        return https_fn.Response(
-            json.dumps({
+        return json_response(
+            {
                 "success": True,
                 "meetingId": meeting_id,
                 "message": "Meeting created successfully"
-            }),
+            },
             status=201,
-            headers={"Content-Type": "application/json"}
+            req=req
         )
         
     except auth.InvalidIdTokenError:
-        return https_fn.Response(
-            json.dumps({"error": "Invalid authentication token"}),
-            status=401,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Invalid authentication token"}, status=401)
     except Exception as e:
         logging.error(f"Error creating meeting: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Internal server error"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
-        )
\ No newline at end of file
+        return json_response({"error": "Internal server error"}, status=500)
\ No newline at end of file
@@ -0,0 +1,112 @@
+from firebase_admin import firestore
+from datetime import datetime, timezone
+import logging
+import os
+
+# Firestore allows at most 500 writes per batch; each closed meeting may use two
+SWEEP_PAGE_SIZE = int(os.getenv('DEADLINE_SWEEP_PAGE_SIZE', '200'))
+QUEUE_FOR_SCORING = os.getenv('DEADLINE_SWEEP_QUEUE_SCORING', 'false').lower() == 'true'
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+def close_expired_meetings(db=None, now: datetime = None, page_size: int = SWEEP_PAGE_SIZE,
+                           queue_for_scoring: bool = QUEUE_FOR_SCORING) -> int:
+    """Close every 'scheduling' meeting whose deadline has passed.
+    
+    Uses the (status, deadline) composite index and pages through results with
+    cursors, committing one batched write per page. Returns the number of
+    meetings closed.
+    """
+    db = db or firestore.client()
+    now = now or datetime.now(timezone.utc)
+    backfill_string_deadlines(db, page_size)
+    
+    # Queueing adds a second write per meeting, so a page must stay within one batch
+    writes_per_meeting = 2 if queue_for_scoring else 1
+    page_size = max(1, min(page_size, MAX_BATCH_WRITES // writes_per_meeting))
+    
+    query = (db.collection('meetings')
+             .where('status', '==', 'scheduling')
+             .where('deadline', '<=', now)
+             .order_by('deadline')
+             .select(['deadline'])
+             .limit(page_size))
+    
+    closed_count = 0
+    last_doc = None
+    while True:
+        page_query = query.start_after(last_doc) if last_doc else query
+        docs = list(page_query.stream())
+        if not docs:
+            break
+        
+        batch = db.batch()
+        for doc in docs:
+            batch.update(doc.reference, {
+                'status': 'closed',
+                'closedAt': firestore.SERVER_TIMESTAMP,
+                'updatedAt': firestore.SERVER_TIMESTAMP,
+            })
+            if queue_for_scoring:
+                batch.set(db.collection('scoringQueue').document(doc.id), {
+                    'meetingId': doc.id,
+                    'reason': 'deadline',
+                    'queuedAt': firestore.SERVER_TIMESTAMP,
+                })
+        batch.commit()
+        
+        closed_count += len(docs)
+        last_doc = docs[-1]
+        if len(docs) < page_size:
+            break
+    
+    logging.info(f"Closed {closed_count} meetings past their deadline")
+    return closed_count
+
+def backfill_string_deadlines(db, page_size: int = SWEEP_PAGE_SIZE) -> int:
+    """Convert legacy ISO string deadlines into timestamps so the sweep's range query sees them.
+    
+    Firestore range filters only match values of the same type, so
+    deadline >= '' returns exactly the meetings whose deadline is a string.
+    """
+    page_size = max(1, min(page_size, MAX_BATCH_WRITES))
+    query = (db.collection('meetings')
+             .where('deadline', '>=', '')
+             .order_by('deadline')
+             .select(['deadline'])
+             .limit(page_size))
+    
+    converted = 0
+    last_doc = None
+    while True:
+        page_query = query.start_after(last_doc) if last_doc else query
+        docs = list(page_query.stream())
+        if not docs:
+            break
+        
+        batch = db.batch()
+        for doc in docs:
+            try:
+                batch.update(doc.reference, {'deadline': parse_deadline(doc.get('deadline'))})
+                converted += 1
+            except (TypeError, ValueError):
+                logging.warning(f"Meeting {doc.id} has an unparseable deadline; leaving it as is")
+        batch.commit()
+        
+        last_doc = docs[-1]
+        if len(docs) < page_size:
+            break
+    
+    if converted:
+        logging.info(f"Converted {converted} string deadlines to timestamps")
+    return converted
+
+def parse_deadline(value):
+    """Convert an ISO 8601 deadline string into a timezone-aware datetime"""
+    if isinstance(value, datetime):
+        deadline = value
+    else:
+        deadline = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline
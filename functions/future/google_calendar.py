@@ -1,7 +1,8 @@
 from firebase_functions import https_fn
 from firebase_admin import firestore, auth
-import json
 import logging
+from future.responses import json_response
+from future.profiling import span
 import os
 from datetime import datetime, timedelta
 from google.auth.transport.requests import Request
@@ -19,11 +20,7 @@ def get_calendar_events_handler(req: https_fn.Request) -> https_fn.Response:
         # Verify authentication
         auth_header = req.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
-            return https_fn.Response(
-                json.dumps({"error": "Unauthorized"}),
-                status=401,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Unauthorized"}, status=401)
         
         token = auth_header.split('Bearer ')[1]
         decoded_token = auth.verify_id_token(token)
@@ -33,11 +30,7 @@ def get_calendar_events_handler(req: https_fn.Request) -> https_fn.Response:
         try:
             data = req.get_json()
         except Exception:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid JSON"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Get required parameters
         start_date = data.get('startDate')
@@ -45,46 +38,29 @@ def get_calendar_events_handler(req: https_fn.Request) -> https_fn.Response:
         access_token = data.get('accessToken')
         
         if not all([start_date, end_date, access_token]):
-            return https_fn.Response(
-                json.dumps({"error": "Missing required parameters: startDate, endDate, accessToken"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Missing required parameters: startDate, endDate, accessToken"}, status=400)
         
         # Get calendar events
         try:
             busy_times = get_busy_times_from_calendar(access_token, start_date, end_date)
             
-            return https_fn.Response(
-                json.dumps({
+            return json_response(
+                {
                     "success": True,
                     "busyTimes": busy_times
-                }),
-                status=200,
-                headers={"Content-Type": "application/json"}
+                },
+                req=req
             )
             
         except Exception as e:
             logging.error(f"Error fetching calendar events: {str(e)}")
-            return https_fn.Response(
-                json.dumps({"error": "Failed to fetch calendar events"}),
-                status=500,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Failed to fetch calendar events"}, status=500)
         
     except auth.InvalidIdTokenError:
-        return https_fn.Response(
-            json.dumps({"error": "Invalid authentication token"}),
-            status=401,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Invalid authentication token"}, status=401)
     except Exception as e:
         logging.error(f"Error in calendar handler: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Internal server error"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Internal server error"}, status=500)
 
 def get_busy_times_from_calendar(access_token: str, start_date: str, end_date: str) -> list:
     """Fetch busy times from Google Calendar"""
@@ -100,13 +76,14 @@ def get_busy_times_from_calendar(access_token: str, start_date: str, end_date: s
         end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
         
         # Get events from primary calendar
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=start_datetime.isoformat(),
-            timeMax=end_datetime.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+        with span('calendar.events.list'):
+            events_result = service.events().list(
+                calendarId='primary',
+                timeMin=start_datetime.isoformat(),
+                timeMax=end_datetime.isoformat(),
+                singleEvents=True,
+                orderBy='startTime'
+            ).execute()
         
         events = events_result.get('items', [])
         
@@ -172,22 +149,17 @@ def generate_auth_url_handler(req: https_fn.Request) -> https_fn.Response:
             include_granted_scopes='true'
         )
         
-        return https_fn.Response(
-            json.dumps({
+        return json_response(
+            {
                 "success": True,
                 "authUrl": auth_url
-            }),
-            status=200,
-            headers={"Content-Type": "application/json"}
+            },
+            req=req
         )
         
     except Exception as e:
         logging.error(f"Error generating auth URL: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Failed to generate authorization URL"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Failed to generate authorization URL"}, status=500)
 
 def exchange_code_for_token_handler(req: https_fn.Request) -> https_fn.Response:
     """Exchange authorization code for access token"""
@@ -196,21 +168,13 @@ def exchange_code_for_token_handler(req: https_fn.Request) -> https_fn.Response:
         try:
             data = req.get_json()
         except Exception:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid JSON"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         code = data.get('code')
         redirect_uri = data.get('redirectUri', 'http://localhost:3000/auth/google/callback')
         
         if not code:
-            return https_fn.Response(
-                json.dumps({"error": "Authorization code required"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Authorization code required"}, status=400)
         
         # Create OAuth flow
         flow = Flow.from_client_config(
@@ -233,21 +197,16 @@ def exchange_code_for_token_handler(req: https_fn.Request) -> https_fn.Response:
         
         credentials = flow.credentials
         
-        return https_fn.Response(
-            json.dumps({
+        return json_response(
+            {
                 "success": True,
                 "accessToken": credentials.token,
                 "refreshToken": credentials.refresh_token,
                 "expiresAt": credentials.expiry.isoformat() if credentials.expiry else None
-            }),
-            status=200,
-            headers={"Content-Type": "application/json"}
+            },
+            req=req
         )
         
     except Exception as e:
         logging.error(f"Error exchanging code for token: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Failed to exchange authorization code"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
-        )
\ No newline at end of file
+        return json_response({"error": "Failed to exchange authorization code"}, status=500)
\ No newline at end of file
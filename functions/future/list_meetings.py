@@ -0,0 +1,139 @@
+from firebase_functions import https_fn
+from firebase_admin import firestore, auth
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime
+from future.responses import json_response
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Only these meeting fields are read for a summary row
+SUMMARY_FIELDS = ['title', 'status', 'deadline', 'createdAt', 'respondentCount', 'bestSlot', 'confirmedDateTime']
+
+def encode_cursor(value: datetime, path: str) -> str:
+    """Pack the last row's sort value and document path into an opaque token"""
+    raw = json.dumps({'v': value.isoformat(), 'p': path}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token: str):
+    padded = token + '=' * (-len(token) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded))
+    if not str(data['p']).startswith('meetings/'):
+        raise ValueError("Cursor does not point at a meeting")
+    return datetime.fromisoformat(data['v']), data['p']
+
+def summary_row(meeting_doc) -> dict:
+    meeting_data = meeting_doc.to_dict() or {}
+    return {
+        'id': meeting_doc.id,
+        'title': meeting_data.get('title', ''),
+        'status': meeting_data.get('status'),
+        'deadline': meeting_data.get('deadline'),
+        'createdAt': meeting_data.get('createdAt'),
+        'respondentCount': meeting_data.get('respondentCount', 0),
+        'bestSlot': meeting_data.get('bestSlot') or meeting_data.get('confirmedDateTime'),
+    }
+
+def list_created_meetings(db, user_uid: str, page_size: int, cursor):
+    """Page through meetings the user created, newest first, on the (creatorUid, createdAt) index"""
+    query = (db.collection('meetings')
+             .where('creatorUid', '==', user_uid)
+             .order_by('createdAt', direction=firestore.Query.DESCENDING)
+             .order_by('__name__', direction=firestore.Query.DESCENDING)
+             .select(SUMMARY_FIELDS)
+             .limit(page_size))
+    if cursor:
+        created_at, path = cursor
+        query = query.start_after({'createdAt': created_at, '__name__': db.document(path)})
+
+    docs = list(query.stream())
+    rows = [summary_row(doc) for doc in docs]
+    next_cursor = None
+    if len(docs) == page_size and docs[-1].get('createdAt'):
+        next_cursor = encode_cursor(docs[-1].get('createdAt'), docs[-1].reference.path)
+    return rows, next_cursor
+
+def list_responded_meetings(db, user_uid: str, page_size: int, cursor):
+    """Page through meetings the user responded to, most recent response first.
+
+    Uses a collection-group query over availabilities on (userId, submittedAt),
+    then fetches the projected parent meetings in one batched read.
+    """
+    query = (db.collection_group('availabilities')
+             .where('userId', '==', user_uid)
+             .order_by('submittedAt', direction=firestore.Query.DESCENDING)
+             .order_by('__name__', direction=firestore.Query.DESCENDING)
+             .select(['submittedAt'])
+             .limit(page_size))
+    if cursor:
+        submitted_at, path = cursor
+        query = query.start_after({'submittedAt': submitted_at, '__name__': db.document(path)})
+
+    availability_docs = list(query.stream())
+    meeting_refs = [doc.reference.parent.parent for doc in availability_docs]
+    meetings = {
+        doc.id: doc
+        for doc in db.get_all(meeting_refs, field_paths=SUMMARY_FIELDS)
+        if doc.exists
+    }
+
+    rows = []
+    for availability_doc, meeting_ref in zip(availability_docs, meeting_refs):
+        meeting_doc = meetings.get(meeting_ref.id)
+        if meeting_doc is None:
+            continue
+        row = summary_row(meeting_doc)
+        row['respondedAt'] = availability_doc.get('submittedAt')
+        rows.append(row)
+
+    next_cursor = None
+    if len(availability_docs) == page_size and availability_docs[-1].get('submittedAt'):
+        next_cursor = encode_cursor(availability_docs[-1].get('submittedAt'), availability_docs[-1].reference.path)
+    return rows, next_cursor
+
+def list_meetings_handler(req: https_fn.Request) -> https_fn.Response:
+    """Handle "my meetings" listing requests with cursor pagination"""
+    try:
+        # Verify authentication
+        auth_header = req.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return json_response({"error": "Unauthorized"}, status=401)
+
+        token = auth_header.split('Bearer ')[1]
+        decoded_token = auth.verify_id_token(token)
+        user_uid = decoded_token['uid']
+
+        role = req.args.get('role', 'created')
+        if role not in ('created', 'responded'):
+            return json_response({"error": "role must be 'created' or 'responded'"}, status=400)
+
+        try:
+            page_size = max(1, min(int(req.args.get('pageSize', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+            cursor_token = req.args.get('cursor')
+            cursor = decode_cursor(cursor_token) if cursor_token else None
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            return json_response({"error": "Invalid pageSize or cursor"}, status=400)
+
+        db = firestore.client()
+        if role == 'created':
+            rows, next_cursor = list_created_meetings(db, user_uid, page_size, cursor)
+        else:
+            rows, next_cursor = list_responded_meetings(db, user_uid, page_size, cursor)
+
+        return json_response(
+            {
+                "success": True,
+                "meetings": rows,
+                "nextCursor": next_cursor
+            },
+            req=req
+        )
+
+    except auth.InvalidIdTokenError:
+        return json_response({"error": "Invalid authentication token"}, status=401)
+    except Exception as e:
+        logging.error(f"Error listing meetings: {str(e)}")
+        return json_response({"error": "Internal server error"}, status=500)
@@ -0,0 +1,110 @@
+from firebase_functions import https_fn
+from firebase_admin import firestore, auth
+import contextvars
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Profiling is off unless a request opts in with this header or is sampled
+PROFILE_HEADER = 'X-Debug-Profile'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_ALLOWED_UIDS = {uid for uid in os.getenv('PROFILE_ALLOWED_UIDS', '').split(',') if uid}
+# 'firestore' writes to the debugProfiles collection; anything else is a local directory
+PROFILE_OUTPUT = os.getenv('PROFILE_OUTPUT', '/tmp/profiles')
+PROFILE_TOP_FUNCTIONS = 40
+
+_active_spans = contextvars.ContextVar('profile_spans', default=None)
+
+@contextmanager
+def span(name: str):
+    """Time a block (Firestore, Gemini, Calendar calls) when the request is being profiled"""
+    spans = _active_spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append({
+            'name': name,
+            'startMs': round((start - spans.started_at) * 1000, 3),
+            'durationMs': round((time.perf_counter() - start) * 1000, 3),
+        })
+
+class _SpanList(list):
+    def __init__(self, started_at: float):
+        super().__init__()
+        self.started_at = started_at
+
+def is_profiling_authorized(req: https_fn.Request) -> bool:
+    """Allow header-triggered profiling only for callers with the profiler claim or an allowed UID"""
+    auth_header = req.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return False
+    try:
+        decoded_token = auth.verify_id_token(auth_header.split('Bearer ')[1])
+    except Exception:
+        return False
+    return decoded_token.get('profiler') is True or decoded_token['uid'] in PROFILE_ALLOWED_UIDS
+
+def should_profile(req: https_fn.Request) -> bool:
+    if req.headers.get(PROFILE_HEADER) == '1':
+        return is_profiling_authorized(req)
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def profiled(handler_name: str):
+    """Wrap a request handler so opted-in or sampled requests are profiled with cProfile"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(req: https_fn.Request) -> https_fn.Response:
+            if not should_profile(req):
+                return handler(req)
+            
+            started_at = time.perf_counter()
+            spans = _SpanList(started_at)
+            token = _active_spans.set(spans)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return handler(req)
+            finally:
+                profiler.disable()
+                _active_spans.reset(token)
+                duration_ms = (time.perf_counter() - started_at) * 1000
+                try:
+                    save_profile(handler_name, req, profiler, spans, duration_ms)
+                except Exception as e:
+                    logging.error(f"Error saving profile: {str(e)}")
+        return wrapper
+    return decorator
+
+def save_profile(handler_name: str, req: https_fn.Request, profiler: cProfile.Profile,
+                 spans: list, duration_ms: float) -> None:
+    """Write a profile to the debugProfiles collection or to a local .prof file"""
+    created_at = datetime.now(timezone.utc)
+    
+    if PROFILE_OUTPUT == 'firestore':
+        stats_text = io.StringIO()
+        pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        firestore.client().collection('debugProfiles').add({
+            'handler': handler_name,
+            'path': req.path,
+            'durationMs': round(duration_ms, 3),
+            'spans': list(spans),
+            'stats': stats_text.getvalue(),
+            'createdAt': created_at,
+        })
+        return
+    
+    os.makedirs(PROFILE_OUTPUT, exist_ok=True)
+    filename = f"{handler_name}-{created_at.strftime('%Y%m%dT%H%M%S%f')}.prof"
+    profiler.dump_stats(os.path.join(PROFILE_OUTPUT, filename))
+    logging.info(f"Profile {filename}: {duration_ms:.1f} ms, spans={list(spans)}")
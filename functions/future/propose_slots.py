@@ -0,0 +1,180 @@
+from firebase_functions import https_fn
+from firebase_admin import auth
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from future.responses import json_response
+from future.time_slots import parse_slot, slot_key
+
+# Guard rails for a single request
+MAX_BUSY_INTERVALS = 50000
+MAX_PROPOSALS = 50
+DEFAULT_PROPOSALS = 10
+
+Interval = Tuple[datetime, datetime]
+
+def merge_intervals(intervals: List[Interval], window_start: datetime, window_end: datetime) -> List[Interval]:
+    """Clip intervals to the search window and merge overlapping ones"""
+    clipped = sorted(
+        (max(start, window_start), min(end, window_end))
+        for start, end in intervals
+        if end > window_start and start < window_end and end > start
+    )
+    merged: List[Interval] = []
+    for start, end in clipped:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def find_free_windows(busy_by_invitee: Dict[str, List[Interval]], window_start: datetime,
+                      window_end: datetime, duration: timedelta, limit: int = DEFAULT_PROPOSALS,
+                      step: Optional[timedelta] = None) -> List[dict]:
+    """Find the windows of the given duration where the most invitees are free.
+
+    Candidate starts are the search window start, every busy end and every
+    busy start minus the duration; an optimal window always begins at one of
+    them. A sweep over the sorted interval endpoints then counts, for each
+    candidate, how many invitees have a busy interval overlapping it.
+    Results are non-overlapping and ranked by free invitees, then start time.
+    """
+    latest_start = window_end - duration
+    if latest_start < window_start:
+        return []
+
+    merged = {
+        invitee: merge_intervals(intervals, window_start, window_end)
+        for invitee, intervals in busy_by_invitee.items()
+    }
+    all_intervals = [(start, end, invitee) for invitee, intervals in merged.items() for start, end in intervals]
+
+    candidates = {window_start}
+    for start, end, _ in all_intervals:
+        candidates.add(end)
+        candidates.add(start - duration)
+    if step:
+        # Snap candidates up onto the step grid anchored at the window start
+        candidates = {
+            window_start + step * -(-(candidate - window_start) // step) if candidate > window_start else window_start
+            for candidate in candidates
+        }
+    starts = sorted(c for c in candidates if window_start <= c <= latest_start)
+
+    # An interval overlaps [s, s + duration) when start < s + duration and end > s
+    by_start = sorted(all_intervals, key=lambda interval: interval[0])
+    by_end = sorted(all_intervals, key=lambda interval: interval[1])
+    active_per_invitee: Dict[str, int] = {}
+    busy_count = 0
+    next_start = next_end = 0
+    scored = []
+    for candidate in starts:
+        window_close = candidate + duration
+        while next_start < len(by_start) and by_start[next_start][0] < window_close:
+            invitee = by_start[next_start][2]
+            active_per_invitee[invitee] = active_per_invitee.get(invitee, 0) + 1
+            if active_per_invitee[invitee] == 1:
+                busy_count += 1
+            next_start += 1
+        while next_end < len(by_end) and by_end[next_end][1] <= candidate:
+            invitee = by_end[next_end][2]
+            active_per_invitee[invitee] -= 1
+            if active_per_invitee[invitee] == 0:
+                busy_count -= 1
+            next_end += 1
+        scored.append((busy_count, candidate))
+
+    # Fewest busy invitees first, earliest first; skip windows overlapping one already chosen
+    scored.sort()
+    chosen: List[Tuple[int, datetime]] = []
+    for busy, candidate in scored:
+        if len(chosen) >= limit:
+            break
+        if any(abs(candidate - other) < duration for _, other in chosen):
+            continue
+        chosen.append((busy, candidate))
+
+    total = len(busy_by_invitee)
+    proposals = []
+    for busy, candidate in chosen:
+        window_close = candidate + duration
+        busy_invitees = sorted(
+            invitee for invitee, intervals in merged.items()
+            if any(start < window_close and end > candidate for start, end in intervals)
+        )
+        proposals.append({
+            'start': slot_key(candidate),
+            'end': slot_key(window_close),
+            'freeCount': total - busy,
+            'totalInvitees': total,
+            'busyInvitees': busy_invitees,
+        })
+    return proposals
+
+def propose_slots_handler(req: https_fn.Request) -> https_fn.Response:
+    """Propose candidate meeting times from invitees' busy intervals"""
+    try:
+        # Verify authentication
+        auth_header = req.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return json_response({"error": "Unauthorized"}, status=401)
+
+        token = auth_header.split('Bearer ')[1]
+        auth.verify_id_token(token)
+
+        # Parse request body
+        try:
+            data = req.get_json()
+        except Exception:
+            return json_response({"error": "Invalid JSON"}, status=400)
+
+        # Validate required fields
+        required_fields = ['busy', 'windowStart', 'windowEnd', 'durationMinutes']
+        for field in required_fields:
+            if field not in data:
+                return json_response({"error": f"Missing required field: {field}"}, status=400)
+
+        # busy maps each invitee to intervals shaped like get_busy_times_from_calendar output;
+        # invitees listed without busy times count as free throughout
+        try:
+            window_start = parse_slot(data['windowStart'])
+            window_end = parse_slot(data['windowEnd'])
+            duration = timedelta(minutes=int(data['durationMinutes']))
+            step = timedelta(minutes=int(data['stepMinutes'])) if data.get('stepMinutes') else None
+            limit = max(1, min(int(data.get('limit', DEFAULT_PROPOSALS)), MAX_PROPOSALS))
+
+            busy_by_invitee = {invitee: [] for invitee in data.get('invitees', [])}
+            interval_count = 0
+            for invitee, intervals in data['busy'].items():
+                interval_count += len(intervals)
+                busy_by_invitee[invitee] = [
+                    (parse_slot(interval['start']), parse_slot(interval['end']))
+                    for interval in intervals
+                ]
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return json_response({"error": f"Invalid request: {str(e)}"}, status=400)
+
+        if duration <= timedelta(0) or (step is not None and step <= timedelta(0)):
+            return json_response({"error": "durationMinutes and stepMinutes must be positive"}, status=400)
+
+        if interval_count > MAX_BUSY_INTERVALS:
+            return json_response({"error": f"Too many busy intervals (max {MAX_BUSY_INTERVALS})"}, status=400)
+
+        proposals = find_free_windows(busy_by_invitee, window_start, window_end, duration, limit, step)
+
+        return json_response(
+            {
+                "success": True,
+                "proposals": proposals,
+                # Ready to pass as timeSlots to create_meeting
+                "timeSlots": [proposal['start'] for proposal in proposals]
+            },
+            req=req
+        )
+
+    except auth.InvalidIdTokenError:
+        return json_response({"error": "Invalid authentication token"}, status=401)
+    except Exception as e:
+        logging.error(f"Error proposing slots: {str(e)}")
+        return json_response({"error": "Internal server error"}, status=500)
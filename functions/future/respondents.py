@@ -0,0 +1,45 @@
+from firebase_admin import firestore
+import logging
+from future.auto_finalize import TRACKING_FIELDS, finalize_meeting, invitee_response_update
+
+@firestore.transactional
+def record_new_respondent(transaction, availability_ref) -> bool:
+    """Count a new availability document once, stamp it, and track the invitee quorum.
+
+    The frontend used to write availabilities directly with setDoc, without
+    userId or submittedAt, so both are filled in when missing.
+    respondentCounted makes duplicate trigger deliveries a no-op. Returns
+    True when this response completes the quorum.
+    """
+    meeting_ref = availability_ref.parent.parent
+    availability_snapshot = availability_ref.get(transaction=transaction)
+    meeting_snapshot = meeting_ref.get(field_paths=TRACKING_FIELDS, transaction=transaction)
+    if not availability_snapshot.exists or not meeting_snapshot.exists:
+        return False
+
+    availability_data = availability_snapshot.to_dict() or {}
+    if availability_data.get('respondentCounted'):
+        return False
+
+    stamp = {'respondentCounted': True}
+    if not availability_data.get('userId'):
+        stamp['userId'] = availability_ref.id
+    if not availability_data.get('submittedAt'):
+        stamp['submittedAt'] = availability_data.get('updatedAt') or firestore.SERVER_TIMESTAMP
+    transaction.update(availability_ref, stamp)
+
+    meeting_update, quorum_reached = invitee_response_update(
+        meeting_snapshot.to_dict(), availability_ref.id, availability_data.get('userName', '')
+    )
+    meeting_update['respondentCount'] = firestore.Increment(1)
+    transaction.update(meeting_ref, meeting_update)
+    return quorum_reached
+
+def handle_respondent_created(meeting_id: str, user_id: str) -> None:
+    """Record a new response and finalize the meeting once everyone expected has answered"""
+    db = firestore.client()
+    availability_ref = (db.collection('meetings').document(meeting_id)
+                        .collection('availabilities').document(user_id))
+    if record_new_respondent(db.transaction(), availability_ref):
+        logging.info(f"All expected invitees responded to meeting {meeting_id}; finalizing")
+        finalize_meeting(meeting_id)
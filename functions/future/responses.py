@@ -0,0 +1,79 @@
+from firebase_functions import https_fn
+from pydantic import BaseModel
+from datetime import date, datetime
+import base64
+import gzip
+import json
+import os
+from typing import Optional
+
+# orjson and brotli are optional; fall back to the standard library without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; compressing them costs more than it saves
+COMPRESSION_THRESHOLD = int(os.getenv('RESPONSE_COMPRESSION_THRESHOLD', '1024'))
+
+def to_json_value(value):
+    """Convert Firestore and other non-JSON types into JSON-compatible values"""
+    # Firestore timestamps arrive as DatetimeWithNanoseconds, a datetime subclass
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    # GeoPoint
+    if hasattr(value, 'latitude') and hasattr(value, 'longitude'):
+        return {'latitude': value.latitude, 'longitude': value.longitude}
+    # DocumentReference
+    if hasattr(value, 'path') and hasattr(value, 'id'):
+        return value.path
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_json(payload) -> bytes:
+    """Serialize a payload to JSON bytes, handling Firestore types at any depth"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=to_json_value)
+    return json.dumps(payload, default=to_json_value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+def json_response(payload, status: int = 200, req: Optional[https_fn.Request] = None) -> https_fn.Response:
+    """Build a JSON response, compressing large bodies when the request allows it"""
+    body = encode_json(payload)
+    headers = {"Content-Type": "application/json"}
+    
+    if req is not None and len(body) >= COMPRESSION_THRESHOLD:
+        encoding = negotiate_encoding(req.headers.get('Accept-Encoding', ''))
+        if encoding == 'br':
+            body = brotli.compress(body, quality=5)
+        elif encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=6)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    
+    return https_fn.Response(body, status=status, headers=headers)
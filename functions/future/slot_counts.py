@@ -0,0 +1,50 @@
+from typing import Dict, Optional
+
+# Statuses a schedule cell may hold; each is tallied per slot on the meeting document
+AVAILABILITY_STATUSES = ('available', 'maybe', 'unavailable')
+
+SlotCounts = Dict[str, Dict[str, int]]
+
+def apply_schedule_delta(slot_counts: SlotCounts, old_schedule: dict, new_schedule: dict) -> None:
+    """Move one participant's tallies from their old schedule to their new one, in place"""
+    for schedule, step in ((old_schedule, -1), (new_schedule, 1)):
+        for slot, availability in schedule.items():
+            status = (availability or {}).get('status')
+            if status not in AVAILABILITY_STATUSES:
+                continue
+            counts = slot_counts.setdefault(slot, {})
+            counts[status] = counts.get(status, 0) + step
+            if counts[status] <= 0:
+                del counts[status]
+            if not counts:
+                del slot_counts[slot]
+
+def best_slot_from_counts(slot_counts: SlotCounts) -> Optional[str]:
+    """Pick the slot score_time_slots would rank first: available counts double, maybe once.
+
+    Ties go to the earliest slot; None when nobody can make any slot.
+    """
+    best, best_score = None, 0
+    for slot in sorted(slot_counts):
+        counts = slot_counts[slot]
+        score = counts.get('available', 0) * 2 + counts.get('maybe', 0)
+        if score > best_score:
+            best, best_score = slot, score
+    return best
+
+def read_slot_counts(transaction, meeting_ref) -> SlotCounts:
+    """Read a meeting's per-slot tallies inside a transaction.
+
+    Meetings that predate the counters are rebuilt from their availabilities
+    once; after that every submission only adjusts the stored tallies.
+    """
+    snapshot = meeting_ref.get(field_paths=['slotCounts'], transaction=transaction)
+    slot_counts = (snapshot.to_dict() or {}).get('slotCounts')
+    if slot_counts is not None:
+        return slot_counts
+
+    slot_counts = {}
+    availabilities_query = meeting_ref.collection('availabilities').select(['schedule'])
+    for doc in transaction.get(availabilities_query):
+        apply_schedule_delta(slot_counts, {}, (doc.to_dict() or {}).get('schedule') or {})
+    return slot_counts
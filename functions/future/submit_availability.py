@@ -1,7 +1,11 @@
 from firebase_functions import https_fn
 from firebase_admin import firestore, auth
-import json
+from google.cloud.firestore_v1.field_path import FieldPath
 import logging
+from future.responses import json_response
+from datetime import datetime, timezone
+from future.deadline_sweeper import parse_deadline
+from future.slot_counts import AVAILABILITY_STATUSES, apply_schedule_delta, best_slot_from_counts, read_slot_counts
 
 def submit_availability_handler(req: https_fn.Request) -> https_fn.Response:
     """Handle participant availability submission"""
@@ -9,11 +13,7 @@ def submit_availability_handler(req: https_fn.Request) -> https_fn.Response:
         # Extract meeting ID from path
         path_parts = req.path.strip('/').split('/')
         if len(path_parts) < 2:
-            return https_fn.Response(
-                json.dumps({"error": "Meeting ID required"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Meeting ID required"}, status=400)
         
         meeting_id = path_parts[-1]
         
@@ -21,21 +21,16 @@ def submit_availability_handler(req: https_fn.Request) -> https_fn.Response:
         try:
             data = req.get_json()
         except Exception:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid JSON"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Invalid JSON"}, status=400)
+        
+        # PATCH requests carry only the changed slots plus the revision they were based on
+        is_delta = req.method == 'PATCH'
         
         # Validate required fields
-        required_fields = ['userName', 'schedule']
+        required_fields = ['userName', 'changes', 'revision'] if is_delta else ['userName', 'schedule']
         for field in required_fields:
             if field not in data:
-                return https_fn.Response(
-                    json.dumps({"error": f"Missing required field: {field}"}),
-                    status=400,
-                    headers={"Content-Type": "application/json"}
-                )
+                return json_response({"error": f"Missing required field: {field}"}, status=400)
         
         # Generate user ID if not authenticated
         user_id = None
@@ -60,53 +55,156 @@ def submit_availability_handler(req: https_fn.Request) -> https_fn.Response:
         meeting_doc = meeting_ref.get()
         
         if not meeting_doc.exists:
-            return https_fn.Response(
-                json.dumps({"error": "Meeting not found"}),
-                status=404,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Meeting not found"}, status=404)
         
         meeting_data = meeting_doc.to_dict()
         if meeting_data.get('status') != 'scheduling':
-            return https_fn.Response(
-                json.dumps({"error": "Meeting is no longer accepting responses"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Meeting is no longer accepting responses"}, status=400)
         
-        # Check if deadline has passed
+        # The deadline sweeper closes expired meetings in bulk; this only covers the gap between sweeps
         deadline = meeting_data.get('deadline')
-        if deadline and deadline < firestore.SERVER_TIMESTAMP:
-            return https_fn.Response(
-                json.dumps({"error": "Response deadline has passed"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+        if deadline and not isinstance(deadline, datetime):
+            # Meetings created before deadlines were stored as timestamps hold ISO strings
+            try:
+                deadline = parse_deadline(deadline)
+            except (TypeError, ValueError):
+                deadline = None
+        if isinstance(deadline, datetime) and deadline <= datetime.now(timezone.utc):
+            return json_response({"error": "Response deadline has passed"}, status=400)
         
-        # Save participant availability
-        availability_data = {
-            'userName': data['userName'],
-            'schedule': data['schedule'],
-            'submittedAt': firestore.SERVER_TIMESTAMP,
-        }
+        if is_delta:
+            changes = data['changes']
+            if not isinstance(changes, dict) or not changes:
+                return json_response({"error": "changes must be a non-empty object"}, status=400)
+            if not isinstance(data['revision'], int):
+                return json_response({"error": "revision must be an integer"}, status=400)
+            for slot_key, value in changes.items():
+                if not slot_key or not is_valid_availability(value, allow_none=True):
+                    return json_response({"error": f"Invalid change for slot: {slot_key!r}"}, status=400)
         
+        # Save participant availability
         availability_ref = meeting_ref.collection('availabilities').document(user_id)
-        availability_ref.set(availability_data)
+        transaction = db.transaction()
+        try:
+            if is_delta:
+                revision = apply_availability_changes(
+                    transaction, availability_ref, data['userName'], data['changes'], data['revision']
+                )
+            else:
+                revision = replace_availability(
+                    transaction, availability_ref, data['userName'], data['schedule']
+                )
+        except RevisionConflictError as e:
+            return json_response(
+                {
+                    "error": "Availability was modified by another request",
+                    "revision": e.current_revision
+                },
+                status=409
+            )
         
-        return https_fn.Response(
-            json.dumps({
+        return json_response(
+            {
                 "success": True,
                 "userId": user_id,
+                "revision": revision,
                 "message": "Availability submitted successfully"
-            }),
-            status=200,
-            headers={"Content-Type": "application/json"}
+            },
+            req=req
         )
         
     except Exception as e:
         logging.error(f"Error submitting availability: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Internal server error"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
-        )
\ No newline at end of file
+        return json_response({"error": "Internal server error"}, status=500)
+
+def is_valid_availability(value, allow_none: bool = False) -> bool:
+    """Accept a schedule cell dict with a known status (or None to clear the slot in a delta)"""
+    if value is None:
+        return allow_none
+    return isinstance(value, dict) and value.get('status') in AVAILABILITY_STATUSES
+
+class RevisionConflictError(Exception):
+    """Raised when a delta submission was based on a stale availability revision"""
+    def __init__(self, current_revision: int):
+        super().__init__(f"Current revision is {current_revision}")
+        self.current_revision = current_revision
+
+def update_slot_counts(transaction, availability_ref, old_schedule: dict, new_schedule: dict) -> None:
+    """Adjust the meeting's per-slot tallies and best slot for one participant's new schedule.
+
+    Must run after the transaction's other reads: it reads the meeting and
+    then writes to it.
+    """
+    meeting_ref = availability_ref.parent.parent
+    slot_counts = read_slot_counts(transaction, meeting_ref)
+    apply_schedule_delta(slot_counts, old_schedule, new_schedule)
+    transaction.update(meeting_ref, {
+        'slotCounts': slot_counts,
+        'bestSlot': best_slot_from_counts(slot_counts),
+    })
+
+@firestore.transactional
+def replace_availability(transaction, availability_ref, user_name: str, schedule: dict) -> int:
+    """Overwrite a participant's whole schedule and bump its revision"""
+    snapshot = availability_ref.get(field_paths=['revision', 'schedule'], transaction=transaction)
+    stored = snapshot.to_dict() or {}
+    revision = stored.get('revision', 0) + 1
+    
+    update_slot_counts(transaction, availability_ref, stored.get('schedule') or {}, schedule)
+    transaction.set(availability_ref, {
+        'userId': availability_ref.id,
+        'userName': user_name,
+        'schedule': schedule,
+        'revision': revision,
+        'submittedAt': firestore.SERVER_TIMESTAMP,
+    })
+    return revision
+
+@firestore.transactional
+def apply_availability_changes(transaction, availability_ref, user_name: str, changes: dict, base_revision: int) -> int:
+    """Apply changed slots with field-path updates if the stored revision still matches"""
+    snapshot = availability_ref.get(field_paths=['revision', 'schedule'], transaction=transaction)
+    stored = snapshot.to_dict() or {}
+    current_revision = stored.get('revision', 0)
+    if current_revision != base_revision:
+        raise RevisionConflictError(current_revision)
+    
+    revision = current_revision + 1
+    old_schedule = stored.get('schedule') or {}
+    new_schedule = {**old_schedule, **changes}
+    update_slot_counts(
+        transaction, availability_ref, old_schedule,
+        {slot_key: value for slot_key, value in new_schedule.items() if value is not None}
+    )
+    if not snapshot.exists:
+        # First submission: nothing to patch yet, so write the changes as the initial schedule
+        transaction.set(availability_ref, {
+            'userId': availability_ref.id,
+            'userName': user_name,
+            'schedule': {k: v for k, v in changes.items() if v is not None},
+            'revision': revision,
+            'submittedAt': firestore.SERVER_TIMESTAMP,
+        })
+        return revision
+    
+    update_data = schedule_changes_update(changes)
+    update_data['userId'] = availability_ref.id
+    update_data['userName'] = user_name
+    update_data['revision'] = revision
+    update_data['submittedAt'] = firestore.SERVER_TIMESTAMP
+    
+    transaction.update(availability_ref, update_data)
+    return revision
+
+def schedule_changes_update(changes: dict) -> dict:
+    """Map changed slots to field-path updates; a None value removes the slot.
+
+    Slot keys are ISO timestamps containing dots, so each path is quoted
+    with FieldPath instead of being joined into a dotted string.
+    """
+    return {
+        FieldPath('schedule', slot_key).to_api_repr(): (
+            firestore.DELETE_FIELD if value is None else value
+        )
+        for slot_key, value in changes.items()
+    }
@@ -0,0 +1,115 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List
+from zoneinfo import ZoneInfo
+from pydantic import BaseModel, field_validator
+
+# Upper bound on a rule's date range so a bad request cannot expand forever
+MAX_RULE_DAYS = 366
+
+class SlotRule(BaseModel):
+    startDate: str  # yyyy-mm-dd
+    endDate: str  # yyyy-mm-dd, inclusive
+    dailyStart: str  # HH:MM local time
+    dailyEnd: str  # HH:MM local time, exclusive
+    stepMinutes: int = 30
+    weekdays: List[int] = [0, 1, 2, 3, 4, 5, 6]  # Monday = 0
+    timeZone: str = 'Asia/Tokyo'
+    exclusions: List[str] = []  # yyyy-mm-dd for whole days, ISO 8601 for single slots
+
+    @field_validator('startDate', 'endDate')
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        date.fromisoformat(value)
+        return value
+
+    @field_validator('dailyStart', 'dailyEnd')
+    @classmethod
+    def check_time(cls, value: str) -> str:
+        time.fromisoformat(value)
+        return value
+
+    @field_validator('stepMinutes')
+    @classmethod
+    def check_step(cls, value: int) -> int:
+        if value < 5 or value > 24 * 60:
+            raise ValueError('stepMinutes must be between 5 and 1440')
+        return value
+
+    @field_validator('weekdays')
+    @classmethod
+    def check_weekdays(cls, value: List[int]) -> List[int]:
+        if any(day < 0 or day > 6 for day in value):
+            raise ValueError('weekdays must be between 0 (Monday) and 6 (Sunday)')
+        return sorted(set(value))
+
+    @field_validator('timeZone')
+    @classmethod
+    def check_time_zone(cls, value: str) -> str:
+        ZoneInfo(value)
+        return value
+
+def slot_key(slot: datetime) -> str:
+    """Format a slot the way the frontend keys schedules (Date.toISOString())"""
+    utc = slot.astimezone(timezone.utc)
+    return utc.strftime('%Y-%m-%dT%H:%M:%S.') + f"{utc.microsecond // 1000:03d}Z"
+
+def parse_slot(value) -> datetime:
+    """Convert an ISO 8601 string or Firestore timestamp into an aware datetime"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def iter_rule_slots(rule: SlotRule) -> Iterator[datetime]:
+    """Lazily expand a slot rule into aware datetimes, in chronological order"""
+    tz = ZoneInfo(rule.timeZone)
+    start_date = date.fromisoformat(rule.startDate)
+    end_date = date.fromisoformat(rule.endDate)
+    if (end_date - start_date).days > MAX_RULE_DAYS:
+        raise ValueError(f"Slot rule spans more than {MAX_RULE_DAYS} days")
+    
+    daily_start = time.fromisoformat(rule.dailyStart)
+    daily_end = time.fromisoformat(rule.dailyEnd)
+    step = timedelta(minutes=rule.stepMinutes)
+    weekdays = set(rule.weekdays)
+    
+    excluded_days = set()
+    excluded_slots = set()
+    for exclusion in rule.exclusions:
+        if len(exclusion) == 10:
+            excluded_days.add(date.fromisoformat(exclusion))
+        else:
+            excluded_slots.add(slot_key(parse_slot(exclusion)))
+    
+    seen = set()
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays and day not in excluded_days:
+            # Step in local wall-clock time so the grid keeps its local times across DST,
+            # then pin each slot to UTC. Times skipped by a spring-forward gap do not
+            # round-trip and are dropped; repeated fall-back times take the first occurrence.
+            local = datetime.combine(day, daily_start)
+            local_end = datetime.combine(day, daily_end)
+            while local < local_end:
+                slot = local.replace(tzinfo=tz).astimezone(timezone.utc)
+                key = slot_key(slot)
+                if (slot.astimezone(tz).replace(tzinfo=None) == local
+                        and key not in seen and key not in excluded_slots):
+                    seen.add(key)
+                    yield slot
+                local += step
+        day += timedelta(days=1)
+
+def iter_meeting_slots(meeting_data: dict) -> Iterator[datetime]:
+    """Yield a meeting's slots from its slot rule, or from a legacy timeSlots list"""
+    slot_rule = meeting_data.get('slotRule')
+    if slot_rule:
+        yield from iter_rule_slots(SlotRule(**slot_rule))
+        return
+    for value in meeting_data.get('timeSlots', []):
+        yield parse_slot(value)
+
+def meeting_slot_keys(meeting_data: dict) -> List[str]:
+    """Return the schedule keys for every slot of a meeting"""
+    return [slot_key(slot) for slot in iter_meeting_slots(meeting_data)]
@@ -1,7 +1,9 @@
 from firebase_functions import https_fn
 from firebase_admin import firestore, auth
-import json
 import logging
+from future.responses import json_response
+from future.deadline_sweeper import parse_deadline
+from future.archive import ARCHIVE_STATUSES, unarchive_meeting
 
 def update_meeting_handler(req: https_fn.Request) -> https_fn.Response:
     """Handle meeting update requests (host only)"""
@@ -9,11 +11,7 @@ def update_meeting_handler(req: https_fn.Request) -> https_fn.Response:
         # Verify authentication
         auth_header = req.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
-            return https_fn.Response(
-                json.dumps({"error": "Unauthorized"}),
-                status=401,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Unauthorized"}, status=401)
         
         token = auth_header.split('Bearer ')[1]
         decoded_token = auth.verify_id_token(token)
@@ -22,11 +20,7 @@ def update_meeting_handler(req: https_fn.Request) -> https_fn.Response:
         # Extract meeting ID from path
         path_parts = req.path.strip('/').split('/')
         if len(path_parts) < 2:
-            return https_fn.Response(
-                json.dumps({"error": "Meeting ID required"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Meeting ID required"}, status=400)
         
         meeting_id = path_parts[-1]
         
@@ -36,68 +30,67 @@ def update_meeting_handler(req: https_fn.Request) -> https_fn.Response:
         meeting_doc = meeting_ref.get()
         
         if not meeting_doc.exists:
-            return https_fn.Response(
-                json.dumps({"error": "Meeting not found"}),
-                status=404,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Meeting not found"}, status=404)
         
         meeting_data = meeting_doc.to_dict()
         
         # Check if user is the meeting creator
         if meeting_data.get('creatorUid') != user_uid:
-            return https_fn.Response(
-                json.dumps({"error": "Forbidden: Only meeting creator can update"}),
-                status=403,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Forbidden: Only meeting creator can update"}, status=403)
         
         # Parse request body
         try:
             update_data = req.get_json()
         except Exception:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid JSON"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "Invalid JSON"}, status=400)
         
         # Filter allowed update fields
         allowed_fields = ['title', 'description', 'deadline', 'status']
         filtered_data = {k: v for k, v in update_data.items() if k in allowed_fields}
         
+        # Switching to another stored AI candidate does not need a new model call
+        if 'selectedCandidate' in update_data:
+            candidates = meeting_data.get('aiCandidates') or []
+            index = update_data['selectedCandidate']
+            if not isinstance(index, int) or not 0 <= index < len(candidates):
+                return json_response({"error": "Invalid selectedCandidate"}, status=400)
+            filtered_data['status'] = 'confirmed'
+            filtered_data['confirmedDateTime'] = candidates[index]['date']
+            filtered_data['confirmedReason'] = candidates[index]['reason']
+            filtered_data['bestSlot'] = candidates[index]['date']
+        
         if not filtered_data:
-            return https_fn.Response(
-                json.dumps({"error": "No valid fields to update"}),
-                status=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return json_response({"error": "No valid fields to update"}, status=400)
+        
+        if 'deadline' in filtered_data:
+            try:
+                filtered_data['deadline'] = parse_deadline(filtered_data['deadline'])
+            except (TypeError, ValueError):
+                return json_response({"error": "Invalid deadline format"}, status=400)
         
         # Add update timestamp
         filtered_data['updatedAt'] = firestore.SERVER_TIMESTAMP
         
+        # Reopening a finished meeting drops its archive so new responses are not shadowed by it
+        reopened = (meeting_data.get('archived') is True
+                    and filtered_data.get('status', meeting_data.get('status')) not in ARCHIVE_STATUSES)
+        
         # Update meeting document
-        meeting_ref.update(filtered_data)
+        if reopened:
+            unarchive_meeting(db, meeting_ref, filtered_data)
+        else:
+            meeting_ref.update(filtered_data)
         
-        return https_fn.Response(
-            json.dumps({
+        return json_response(
+            {
                 "success": True,
                 "message": "Meeting updated successfully"
-            }),
-            status=200,
-            headers={"Content-Type": "application/json"}
+            },
+            req=req
         )
         
     except auth.InvalidIdTokenError:
-        return https_fn.Response(
-            json.dumps({"error": "Invalid authentication token"}),
-            status=401,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Invalid authentication token"}, status=401)
     except Exception as e:
         logging.error(f"Error updating meeting: {str(e)}")
-        return https_fn.Response(
-            json.dumps({"error": "Internal server error"}),
-            status=500,
-            headers={"Content-Type": "application/json"}
-        )
\ No newline at end of file
+        return json_response({"error": "Internal server error"}, status=500)
\ No newline at end of file
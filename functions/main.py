@@ -1,12 +1,18 @@
-from firebase_functions import https_fn, options
+from firebase_functions import https_fn, options, scheduler_fn, firestore_fn
 from firebase_admin import initialize_app, firestore, auth
-import json
 import logging
+from future.responses import json_response
 from future.create_meeting import create_meeting_handler
 from future.get_meeting import get_meeting_handler
 from future.update_meeting import update_meeting_handler
 from future.submit_availability import submit_availability_handler
 from future.ai_suggestion import run_ai_suggestion_handler
+from future.deadline_sweeper import close_expired_meetings
+from future.propose_slots import propose_slots_handler
+from future.list_meetings import list_meetings_handler
+from future.archive import compact_finished_meetings
+from future.auto_finalize import handle_scoring_queued
+from future.respondents import handle_respondent_created
 
 # Initialize Firebase Admin
 initialize_app()
@@ -24,11 +30,7 @@ def create_meeting(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(status=200)
     
     if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Method not allowed"}),
-            status=405,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Method not allowed"}, status=405)
     
     return create_meeting_handler(req)
 
@@ -42,11 +44,7 @@ def get_meeting(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(status=200)
     
     if req.method != 'GET':
-        return https_fn.Response(
-            json.dumps({"error": "Method not allowed"}),
-            status=405,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Method not allowed"}, status=405)
     
     return get_meeting_handler(req)
 
@@ -60,29 +58,21 @@ def update_meeting(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(status=200)
     
     if req.method != 'PUT':
-        return https_fn.Response(
-            json.dumps({"error": "Method not allowed"}),
-            status=405,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Method not allowed"}, status=405)
     
     return update_meeting_handler(req)
 
 @https_fn.on_request(cors=options.CorsOptions(
     cors_origins=["*"],
-    cors_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    cors_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
 ))
 def submit_availability(req: https_fn.Request) -> https_fn.Response:
-    """Submit participant availability"""
+    """Submit participant availability (POST replaces the schedule, PATCH applies changed slots)"""
     if req.method == 'OPTIONS':
         return https_fn.Response(status=200)
     
-    if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Method not allowed"}),
-            status=405,
-            headers={"Content-Type": "application/json"}
-        )
+    if req.method not in ('POST', 'PATCH'):
+        return json_response({"error": "Method not allowed"}, status=405)
     
     return submit_availability_handler(req)
 
@@ -96,10 +86,54 @@ def run_ai_suggestion(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(status=200)
     
     if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Method not allowed"}),
-            status=405,
-            headers={"Content-Type": "application/json"}
-        )
+        return json_response({"error": "Method not allowed"}, status=405)
+    
+    return run_ai_suggestion_handler(req)
+
+@https_fn.on_request(cors=options.CorsOptions(
+    cors_origins=["*"],
+    cors_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+))
+def propose_slots(req: https_fn.Request) -> https_fn.Response:
+    """Propose candidate meeting times from invitees' busy intervals"""
+    if req.method == 'OPTIONS':
+        return https_fn.Response(status=200)
+    
+    if req.method != 'POST':
+        return json_response({"error": "Method not allowed"}, status=405)
+    
+    return propose_slots_handler(req)
+
+@https_fn.on_request(cors=options.CorsOptions(
+    cors_origins=["*"],
+    cors_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+))
+def list_meetings(req: https_fn.Request) -> https_fn.Response:
+    """List meetings the caller created or responded to"""
+    if req.method == 'OPTIONS':
+        return https_fn.Response(status=200)
     
-    return run_ai_suggestion_handler(req)
\ No newline at end of file
+    if req.method != 'GET':
+        return json_response({"error": "Method not allowed"}, status=405)
+    
+    return list_meetings_handler(req)
+
+@scheduler_fn.on_schedule(schedule="every 5 minutes")
+def sweep_expired_meetings(event: scheduler_fn.ScheduledEvent) -> None:
+    """Close meetings whose response deadline has passed"""
+    close_expired_meetings()
+
+@scheduler_fn.on_schedule(schedule="every 24 hours")
+def compact_archived_meetings(event: scheduler_fn.ScheduledEvent) -> None:
+    """Fold finished meetings' availabilities into compressed archive documents"""
+    compact_finished_meetings()
+
+@firestore_fn.on_document_created(document="meetings/{meetingId}/availabilities/{userId}", timeout_sec=300)
+def track_respondents(event: firestore_fn.Event[firestore_fn.DocumentSnapshot | None]) -> None:
+    """Count a first-time respondent and finalize the meeting once all expected invitees have responded"""
+    handle_respondent_created(event.params['meetingId'], event.params['userId'])
+
+@firestore_fn.on_document_created(document="scoringQueue/{meetingId}", timeout_sec=300)
+def score_queued_meeting(event: firestore_fn.Event[firestore_fn.DocumentSnapshot | None]) -> None:
+    """Pick a time for a meeting the deadline sweeper closed and queued for scoring"""
+    handle_scoring_queued(event.params['meetingId'])
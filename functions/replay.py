@@ -0,0 +1,220 @@
+"""Replay exported meetings through the scheduling logic to compare strategies offline.
+
+Input is JSON Lines, one meeting per line, shaped like the Firestore documents
+with the availabilities subcollection inlined:
+
+    {"id": "...", "title": "...", "timeSlots": [...] or "slotRule": {...},
+     "confirmedDateTime": "...", "requiredAttendees": ["name", ...],
+     "availabilities": [{"userName": "...", "schedule": {...}}, ...]}
+
+Usage:
+    python replay.py meetings.jsonl --output outcomes.jsonl --workers 16
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from future.ai_suggestion import (
+    AISchedulingInput, SlotScore, build_participants, call_gemini_ai,
+    pick_slot_with_required, score_time_slots,
+)
+from future.time_slots import meeting_slot_keys, parse_slot, slot_key
+
+STRATEGIES = ['weighted', 'required', 'model']
+
+class StubModel:
+    """Offline baseline for the model strategy; it does not imitate Gemini.
+
+    Answers with the slots where the fewest participants are unavailable,
+    earliest first, ignoring 'maybe' answers and comments. This is a
+    different ranking from 'weighted', so the two strategies can disagree;
+    pass --real-model to measure the actual model.
+    """
+    def __init__(self, scores: List[SlotScore], candidate_count: int):
+        self.scores = scores
+        self.candidate_count = candidate_count
+
+    def generate_content(self, prompt: str):
+        ranked = sorted(self.scores, key=lambda slot: (slot.unavailableCount, slot.time))
+        candidates = [
+            {"date": slot.time, "reason": f"baseline: {slot.unavailableCount} unavailable", "unavailable": []}
+            for slot in ranked[:self.candidate_count]
+        ]
+        return SimpleNamespace(text=json.dumps({"candidates": candidates}))
+
+def normalize_slot(value) -> Optional[str]:
+    """Convert a stored date/time into a slot key so outcomes can be compared"""
+    if not value:
+        return None
+    try:
+        return slot_key(parse_slot(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+def slot_outcome(slot: Optional[SlotScore], confirmed: Optional[str]) -> Optional[dict]:
+    # A meeting nobody answered has no outcome; counting it would make 0 of 0 look like full attendance
+    if slot is None or slot.totalParticipants == 0:
+        return None
+    outcome = slot.model_dump()
+    outcome['fullAttendance'] = slot.availableCount == slot.totalParticipants
+    outcome['matchesConfirmed'] = confirmed is not None and slot.time == confirmed
+    return outcome
+
+def replay_meeting(line: str, strategies: List[str], candidate_count: int, use_real_model: bool) -> dict:
+    """Replay one exported meeting through every requested strategy"""
+    meeting = json.loads(line)
+    participants = build_participants(meeting.get('availabilities', []))
+    time_slots = meeting_slot_keys(meeting)
+    if not time_slots:
+        time_slots = sorted({avail.time for p in participants for avail in p.availability})
+
+    scores = score_time_slots(time_slots, participants)
+    scores_by_time = {slot.time: slot for slot in scores}
+    confirmed = normalize_slot(meeting.get('confirmedDateTime'))
+
+    results = {}
+    if 'weighted' in strategies:
+        results['weighted'] = slot_outcome(scores[0] if scores else None, confirmed)
+
+    if 'required' in strategies:
+        required = meeting.get('requiredAttendees') or []
+        slot = pick_slot_with_required(scores, participants, required)
+        outcome = slot_outcome(slot or (scores[0] if scores else None), confirmed)
+        # Only meetings that name required attendees say anything about meeting them
+        if outcome is not None and required:
+            outcome['requiredMet'] = slot is not None
+        results['required'] = outcome
+
+    if 'model' in strategies and participants and time_slots:
+        ai_input = AISchedulingInput(
+            meetingTitle=meeting.get('title', ''),
+            timeSlots=time_slots,
+            participants=participants,
+            hostInstructions=meeting.get('hostInstructions', '')
+        )
+        model = None if use_real_model else StubModel(scores, candidate_count)
+        ai_result = call_gemini_ai(ai_input, candidate_count, model=model)
+        best = normalize_slot(ai_result.candidates[0].date)
+        results['model'] = slot_outcome(scores_by_time.get(best), confirmed)
+
+    return {
+        'id': meeting.get('id'),
+        'participants': len(participants),
+        'slots': len(time_slots),
+        'confirmed': confirmed,
+        'strategies': results,
+    }
+
+def _replay_worker(args) -> dict:
+    line, strategies, candidate_count, use_real_model = args
+    try:
+        return replay_meeting(line, strategies, candidate_count, use_real_model)
+    except Exception as e:
+        return {'error': str(e), 'line': line[:200]}
+
+def aggregate(outcomes_stats: Dict[str, dict], outcome: dict) -> None:
+    """Fold one meeting outcome into the running per-strategy statistics"""
+    for name, result in outcome['strategies'].items():
+        stats = outcomes_stats.setdefault(name, {
+            'meetings': 0, 'decided': 0, 'scoreSum': 0.0, 'fullAttendance': 0,
+            'withConfirmed': 0, 'matchesConfirmed': 0, 'withRequired': 0, 'requiredMet': 0,
+        })
+        stats['meetings'] += 1
+        if result is None:
+            continue
+        stats['decided'] += 1
+        stats['scoreSum'] += result['score']
+        stats['fullAttendance'] += result['fullAttendance']
+        if 'requiredMet' in result:
+            stats['withRequired'] += 1
+            stats['requiredMet'] += result['requiredMet']
+        if outcome['confirmed'] is not None:
+            stats['withConfirmed'] += 1
+            stats['matchesConfirmed'] += result['matchesConfirmed']
+
+def summarize(strategy_stats: Dict[str, dict]) -> Dict[str, dict]:
+    summary = {}
+    for name, stats in strategy_stats.items():
+        decided = stats['decided'] or 1
+        summary[name] = {
+            'meetings': stats['meetings'],
+            'decided': stats['decided'],
+            'meanScore': round(stats['scoreSum'] / decided, 3),
+            'fullAttendanceRate': round(stats['fullAttendance'] / decided, 4),
+            'agreementWithConfirmed': (
+                round(stats['matchesConfirmed'] / stats['withConfirmed'], 4)
+                if stats['withConfirmed'] else None
+            ),
+        }
+        if name == 'required':
+            summary[name]['meetingsWithRequired'] = stats['withRequired']
+            summary[name]['requiredMetRate'] = (
+                round(stats['requiredMet'] / stats['withRequired'], 4)
+                if stats['withRequired'] else None
+            )
+    return summary
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay exported meetings through scheduling strategies")
+    parser.add_argument('input', help="JSON Lines export of meetings ('-' for stdin)")
+    parser.add_argument('--output', default='replay_outcomes.jsonl', help="per-meeting outcomes (JSON Lines)")
+    parser.add_argument('--stats', default=None, help="write aggregate stats here instead of stdout")
+    parser.add_argument('--strategies', default=','.join(STRATEGIES),
+                        help=f"comma-separated subset of {', '.join(STRATEGIES)}")
+    parser.add_argument('--candidates', type=int, default=3, help="candidates requested from the model")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--chunksize', type=int, default=256, help="meetings handed to a worker at a time")
+    parser.add_argument('--real-model', action='store_true',
+                        help="call Gemini instead of the offline baseline used for the 'model' strategy")
+    args = parser.parse_args(argv)
+
+    strategies = [s for s in args.strategies.split(',') if s]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+
+    # The model prints a parse error per bad response; keep the console readable
+    logging.basicConfig(level=logging.WARNING)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    tasks = ((line, strategies, args.candidates, args.real_model) for line in source if line.strip())
+
+    started = time.perf_counter()
+    strategy_stats: Dict[str, dict] = {}
+    replayed = failed = 0
+    with open(args.output, 'w', encoding='utf-8') as output, \
+            multiprocessing.Pool(args.workers) as pool:
+        # Workers receive raw lines, so only strings cross the process boundary on the way in
+        for outcome in pool.imap_unordered(_replay_worker, tasks, chunksize=args.chunksize):
+            output.write(json.dumps(outcome, ensure_ascii=False) + '\n')
+            if 'error' in outcome:
+                failed += 1
+                continue
+            replayed += 1
+            aggregate(strategy_stats, outcome)
+
+    if source is not sys.stdin:
+        source.close()
+
+    report = {
+        'replayed': replayed,
+        'failed': failed,
+        'seconds': round(time.perf_counter() - started, 2),
+        'strategies': summarize(strategy_stats),
+    }
+    report_text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.stats:
+        with open(args.stats, 'w', encoding='utf-8') as stats_file:
+            stats_file.write(report_text + '\n')
+    else:
+        print(report_text)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
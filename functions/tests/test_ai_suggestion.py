@@ -0,0 +1,40 @@
+import pytest
+from future.ai_suggestion import assign_chunks, build_participants, chunk_cache_key, parse_int_field
+
+def test_parse_int_field_defaults_when_missing():
+    assert parse_int_field({}, 'candidateCount', 3) == 3
+
+def test_parse_int_field_accepts_integers_and_numeric_strings():
+    assert parse_int_field({'candidateCount': 5}, 'candidateCount', 3) == 5
+    assert parse_int_field({'chunkSize': '40'}, 'chunkSize', 50) == 40
+
+@pytest.mark.parametrize('value', [None, 2.5, True, 'many', [3]])
+def test_parse_int_field_rejects_non_integers(value):
+    with pytest.raises(ValueError, match='candidateCount must be an integer'):
+        parse_int_field({'candidateCount': value}, 'candidateCount', 3)
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+def chunk_keys(doc_ids, chunk_size=10):
+    docs = [FakeSnapshot(doc_id, {'userName': doc_id, 'schedule': {}}) for doc_id in doc_ids]
+    participants = build_participants(doc.to_dict() for doc in docs)
+    return {chunk_cache_key(chunk_docs, []) for chunk_docs, _ in assign_chunks(docs, participants, chunk_size)}
+
+def test_assign_chunks_covers_every_participant_once():
+    docs = [FakeSnapshot(f"uid{i}", {'userName': f"u{i}", 'schedule': {}}) for i in range(100)]
+    participants = build_participants(doc.to_dict() for doc in docs)
+    chunks = assign_chunks(docs, participants, 10)
+    assert sorted(doc.id for chunk_docs, _ in chunks for doc in chunk_docs) == sorted(doc.id for doc in docs)
+    assert all(len(chunk_docs) == len(chunk_participants) for chunk_docs, chunk_participants in chunks)
+
+def test_new_participant_only_invalidates_its_own_chunk():
+    doc_ids = [f"uid{i}" for i in range(100)]
+    before = chunk_keys(doc_ids)
+    after = chunk_keys(doc_ids + ['new-participant'])
+    assert len(before - after) == 1
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from future.archive import build_archive, read_archive
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+def test_archive_round_trip():
+    submitted_at = datetime(2026, 3, 8, 6, 0, tzinfo=timezone.utc)
+    docs = [
+        FakeSnapshot('u1', {
+            'userName': 'Aiko',
+            'schedule': {
+                '2026-03-08T06:00:00.000Z': {'status': 'maybe', 'comment': 'late'},
+                '2026-03-08T06:30:00.000Z': {'status': 'available'},
+            },
+            'revision': 3,
+            'submittedAt': submitted_at,
+        }),
+        FakeSnapshot('u2', {'userName': 'Ben', 'schedule': {}}),
+    ]
+
+    restored = {doc.id: doc.to_dict() for doc in read_archive({'data': build_archive(docs)})}
+
+    assert restored['u1'] == {
+        'userId': 'u1',
+        'userName': 'Aiko',
+        'schedule': {
+            '2026-03-08T06:00:00.000Z': {'status': 'maybe', 'comment': 'late'},
+            '2026-03-08T06:30:00.000Z': {'status': 'available'},
+        },
+        'revision': 3,
+        'submittedAt': submitted_at,
+    }
+    assert restored['u2']['schedule'] == {}
+    assert restored['u2']['submittedAt'] is None
+
+def test_read_archive_projects_fields():
+    docs = [FakeSnapshot('u1', {'userName': 'Aiko', 'schedule': {}, 'revision': 1})]
+    restored = read_archive({'data': build_archive(docs)}, ['userName'])
+    assert restored[0].to_dict() == {'userName': 'Aiko'}
@@ -0,0 +1,24 @@
+from future.slot_counts import apply_schedule_delta, best_slot_from_counts
+
+SLOT_A = '2026-03-08T06:00:00.000Z'
+SLOT_B = '2026-03-08T06:30:00.000Z'
+
+def test_apply_schedule_delta_moves_tallies():
+    slot_counts = {}
+    apply_schedule_delta(slot_counts, {}, {SLOT_A: {'status': 'available'}, SLOT_B: {'status': 'maybe'}})
+    apply_schedule_delta(slot_counts, {}, {SLOT_A: {'status': 'unavailable'}})
+    assert slot_counts == {
+        SLOT_A: {'available': 1, 'unavailable': 1},
+        SLOT_B: {'maybe': 1},
+    }
+
+    apply_schedule_delta(slot_counts, {SLOT_B: {'status': 'maybe'}}, {SLOT_B: {'status': 'available'}})
+    apply_schedule_delta(slot_counts, {SLOT_A: {'status': 'unavailable'}}, {})
+    assert slot_counts == {SLOT_A: {'available': 1}, SLOT_B: {'available': 1}}
+
+def test_best_slot_from_counts_matches_weighted_score():
+    assert best_slot_from_counts({}) is None
+    assert best_slot_from_counts({SLOT_A: {'unavailable': 3}}) is None
+    assert best_slot_from_counts({SLOT_A: {'maybe': 1}, SLOT_B: {'available': 1}}) == SLOT_B
+    # Ties go to the earliest slot
+    assert best_slot_from_counts({SLOT_B: {'available': 1}, SLOT_A: {'maybe': 2}}) == SLOT_A
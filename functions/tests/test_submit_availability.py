@@ -0,0 +1,19 @@
+from firebase_admin import firestore
+from future.submit_availability import is_valid_availability, schedule_changes_update
+
+def test_schedule_changes_update_quotes_slot_keys():
+    update = schedule_changes_update({
+        '2026-03-08T06:00:00.000Z': {'status': 'available'},
+        '2026-03-08T06:30:00.000Z': None,
+    })
+    assert update == {
+        'schedule.`2026-03-08T06:00:00.000Z`': {'status': 'available'},
+        'schedule.`2026-03-08T06:30:00.000Z`': firestore.DELETE_FIELD,
+    }
+
+def test_is_valid_availability():
+    assert is_valid_availability({'status': 'maybe', 'comment': 'late'})
+    assert is_valid_availability(None, allow_none=True)
+    assert not is_valid_availability(None)
+    assert not is_valid_availability({'status': 'busy'})
+    assert not is_valid_availability('available')
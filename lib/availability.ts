@@ -0,0 +1,84 @@
+import type { User } from 'firebase/auth';
+
+export type AvailabilityStatus = 'available' | 'maybe' | 'unavailable';
+
+export interface Availability {
+  status: AvailabilityStatus;
+  comment?: string;
+}
+
+export type Schedule = Record<string, Availability>;
+
+// Thrown when the stored schedule moved past the revision the edit was based on
+export class AvailabilityConflictError extends Error {
+  constructor(public currentRevision: number) {
+    super(`Availability was modified by another request (revision ${currentRevision})`);
+  }
+}
+
+const sameAvailability = (a?: Availability, b?: Availability) =>
+  a?.status === b?.status && (a?.comment || '') === (b?.comment || '');
+
+// Cells that differ from the saved schedule; null clears a slot
+export function diffSchedule(saved: Schedule, current: Schedule): Record<string, Availability | null> {
+  const changes: Record<string, Availability | null> = {};
+  Object.entries(current).forEach(([slotKey, availability]) => {
+    if (!sameAvailability(saved[slotKey], availability)) {
+      changes[slotKey] = { status: availability.status, comment: availability.comment || '' };
+    }
+  });
+  Object.keys(saved).forEach(slotKey => {
+    if (!(slotKey in current)) changes[slotKey] = null;
+  });
+  return changes;
+}
+
+// Send only the changed cells, based on the revision the user was editing; returns the new revision
+export async function saveAvailabilityChanges(
+  meetingId: string,
+  user: User,
+  userName: string,
+  saved: Schedule,
+  current: Schedule,
+  revision: number
+): Promise<number> {
+  const changes = diffSchedule(saved, current);
+  const hasChanges = Object.keys(changes).length > 0;
+  // A rename with no cell changes still needs a write, so fall back to a full replace
+  const response = await fetch(`/api/meetings/${meetingId}/availability`, {
+    method: hasChanges ? 'PATCH' : 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${await user.getIdToken()}`,
+    },
+    body: JSON.stringify(
+      hasChanges ? { userName, changes, revision } : { userName, schedule: current }
+    ),
+  });
+
+  const data = await response.json();
+  if (response.status === 409) {
+    throw new AvailabilityConflictError(data.revision ?? 0);
+  }
+  if (!response.ok) {
+    throw new Error(data.error || 'Failed to save availability');
+  }
+  return data.revision;
+}
+
+export interface ParticipantData {
+  userId: string;
+  userName: string;
+  schedule: Schedule;
+  revision?: number;
+}
+
+// Read participants through getMeeting, which also serves meetings whose responses were archived
+export async function fetchMeetingParticipants(meetingId: string): Promise<ParticipantData[]> {
+  const response = await fetch(`/api/meetings/${meetingId}`);
+  const data = await response.json();
+  if (!response.ok) {
+    throw new Error(data.error || 'Failed to load participants');
+  }
+  return data.participants || [];
+}
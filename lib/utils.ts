@@ -36,6 +36,86 @@ export function generateTimeSlots(
   return slots;
 }
 
+export interface SlotRule {
+  startDate: string; // yyyy-mm-dd
+  endDate: string; // yyyy-mm-dd, inclusive
+  dailyStart: string; // HH:MM local time
+  dailyEnd: string; // HH:MM local time, exclusive
+  stepMinutes?: number;
+  weekdays?: number[]; // Monday = 0
+  timeZone?: string;
+  exclusions?: string[]; // yyyy-mm-dd for whole days, ISO 8601 for single slots
+}
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Offset of a time zone from UTC at the given instant, in milliseconds
+function timeZoneOffset(utcMs: number, timeZone: string): number {
+  const parts = new Intl.DateTimeFormat('en-US', {
+    timeZone,
+    hourCycle: 'h23',
+    year: 'numeric', month: '2-digit', day: '2-digit',
+    hour: '2-digit', minute: '2-digit', second: '2-digit',
+  }).formatToParts(new Date(utcMs));
+  const part = (type: string) => Number(parts.find(p => p.type === type)?.value);
+  const wall = Date.UTC(part('year'), part('month') - 1, part('day'), part('hour'), part('minute'), part('second'));
+  return wall - Math.floor(utcMs / 1000) * 1000;
+}
+
+// Resolve a wall-clock time (encoded as if it were UTC) in a time zone.
+// Returns null for times skipped by a DST gap and the earlier instant for repeated times,
+// matching iter_rule_slots in functions/future/time_slots.py.
+function wallTimeToUtc(wallMs: number, timeZone: string): number | null {
+  const offsets = new Set([
+    timeZoneOffset(wallMs - DAY_MS, timeZone),
+    timeZoneOffset(wallMs + DAY_MS, timeZone),
+  ]);
+  const matches = Array.from(offsets)
+    .map(offset => wallMs - offset)
+    .filter(utcMs => utcMs + timeZoneOffset(utcMs, timeZone) === wallMs);
+  return matches.length ? Math.min(...matches) : null;
+}
+
+// Expand a meeting's slotRule into the same slots the backend scores
+export function expandSlotRule(rule: SlotRule): Date[] {
+  const timeZone = rule.timeZone || 'Asia/Tokyo';
+  const step = rule.stepMinutes || 30;
+  const weekdays = new Set(rule.weekdays ?? [0, 1, 2, 3, 4, 5, 6]);
+  const excludedDays = new Set<string>();
+  const excludedSlots = new Set<string>();
+  (rule.exclusions || []).forEach(exclusion => {
+    if (exclusion.length === 10) {
+      excludedDays.add(exclusion);
+    } else {
+      excludedSlots.add(new Date(exclusion).toISOString());
+    }
+  });
+
+  const [startHour, startMinute] = rule.dailyStart.split(':').map(Number);
+  const [endHour, endMinute] = rule.dailyEnd.split(':').map(Number);
+  const dayStart = startHour * 60 + startMinute;
+  const dayEnd = endHour * 60 + endMinute;
+
+  const slots: Date[] = [];
+  const seen = new Set<string>();
+  const endDay = Date.parse(`${rule.endDate}T00:00:00Z`);
+  for (let day = Date.parse(`${rule.startDate}T00:00:00Z`); day <= endDay; day += DAY_MS) {
+    const dayKey = new Date(day).toISOString().slice(0, 10);
+    const weekday = (new Date(day).getUTCDay() + 6) % 7;
+    if (!weekdays.has(weekday) || excludedDays.has(dayKey)) continue;
+
+    for (let minute = dayStart; minute < dayEnd; minute += step) {
+      const utcMs = wallTimeToUtc(day + minute * 60 * 1000, timeZone);
+      if (utcMs === null) continue;
+      const key = new Date(utcMs).toISOString();
+      if (seen.has(key) || excludedSlots.has(key)) continue;
+      seen.add(key);
+      slots.push(new Date(utcMs));
+    }
+  }
+  return slots;
+}
+
 export function formatTimeSlot(date: Date): string {
   return date.toLocaleDateString('ja-JP', { 
     weekday: 'short',